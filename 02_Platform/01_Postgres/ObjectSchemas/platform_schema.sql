@@ -0,0 +1,70 @@
+begin;
+
+-- Platform-owned diagnostics (inside database "atlas")
+create schema if not exists platform;
+
+-- Slow statements captured by platform_observability.slowquery.
+-- Statement text is normalized (literals -> ?); parameter values are never stored.
+create table if not exists platform.slow_query_log (
+  slow_query_log_id bigserial primary key,
+  captured_at    timestamptz not null default now(),
+
+  app            text null,            -- e.g. workouttracker / mcpgateway
+  request_id     text null,            -- platform_errorhandling request id
+  trace_id       text null,            -- platform_observability trace id
+
+  fingerprint    text not null,        -- hash of the normalized statement
+  statement      text not null,
+  params_shape   jsonb null,           -- parameter types, e.g. ["UUID", "date"]
+
+  duration_ms    numeric(12,3) not null,
+  row_count      bigint null,
+  error          text null,            -- exception type if the statement failed
+
+  plan           jsonb null,           -- EXPLAIN (FORMAT JSON), sampled
+  plan_error     text null
+);
+
+create index if not exists ix_slow_query_log_captured_at
+  on platform.slow_query_log(captured_at);
+
+create index if not exists ix_slow_query_log_fingerprint
+  on platform.slow_query_log(fingerprint, captured_at);
+
+-- Scheduled jobs (platform_scheduler): one lease row per job name. A run
+-- slot is claimed only when the lease has expired and the slot is newer than
+-- last_slot, so each slot runs on one instance only.
+create table if not exists platform.job_lease (
+  job_name       text primary key,
+  owner          text null,            -- app@host:pid of the last claimant
+  leased_until   timestamptz not null,
+  last_slot      timestamptz null,     -- scheduled fire time last claimed
+  updated_at     timestamptz not null default now()
+);
+
+-- Run history of scheduled jobs
+create table if not exists platform.job_run (
+  job_run_id     bigserial primary key,
+  job_name       text not null,
+  app            text null,
+  owner          text not null,
+
+  scheduled_for  timestamptz not null, -- the slot this run was claimed for
+  started_at     timestamptz not null default now(),
+  finished_at    timestamptz null,
+  duration_ms    numeric(12,3) null,
+
+  status         text not null default 'running',
+  error          text null,
+  result         jsonb null,           -- whatever the job returned
+
+  constraint ck_job_run_status check (status in ('running', 'ok', 'error'))
+);
+
+create index if not exists ix_job_run_job_started
+  on platform.job_run(job_name, started_at desc);
+
+create index if not exists ix_job_run_started_at
+  on platform.job_run(started_at);
+
+commit;
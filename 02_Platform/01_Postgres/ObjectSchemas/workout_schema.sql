@@ -61,4 +61,299 @@ create index if not exists ix_workout_log_split
 create index if not exists ix_workout_log_workout_id
   on workout.workout_log(workout_id);
 
+-- ---------------------------------------------------------------------------
+-- Change tracking for delta sync (GET /api/workouts/changes?since=<token>)
+--
+-- change_xid: id of the transaction that last inserted/updated the row.
+-- Unlike updated_at or a sequence, it lets the feed compute a safe watermark:
+-- every transaction below pg_snapshot_xmin(pg_current_snapshot()) has
+-- finished, so a late-committing transaction is never skipped.
+-- Deleted rows leave a tombstone with the deleting transaction's id.
+-- ---------------------------------------------------------------------------
+alter table workout.workout_log
+  add column if not exists change_xid xid8 not null default pg_current_xact_id();
+
+create table if not exists workout.workout_log_tombstone (
+  workout_log_id bigint primary key,
+  workout_id     uuid not null,
+  change_xid     xid8 not null default pg_current_xact_id(),
+  deleted_at     timestamptz not null default now()
+);
+
+create or replace function workout.tg_workout_log_touch() returns trigger
+language plpgsql as $$
+begin
+  new.change_xid := pg_current_xact_id();
+  return new;
+end $$;
+
+create or replace function workout.tg_workout_log_tombstone() returns trigger
+language plpgsql as $$
+begin
+  insert into workout.workout_log_tombstone (workout_log_id, workout_id)
+  values (old.workout_log_id, old.workout_id)
+  on conflict (workout_log_id) do update
+    set change_xid = excluded.change_xid, deleted_at = excluded.deleted_at;
+  return old;
+end $$;
+
+drop trigger if exists workout_log_touch on workout.workout_log;
+create trigger workout_log_touch
+  before update on workout.workout_log
+  for each row execute function workout.tg_workout_log_touch();
+
+drop trigger if exists workout_log_tombstone on workout.workout_log;
+create trigger workout_log_tombstone
+  after delete on workout.workout_log
+  for each row execute function workout.tg_workout_log_tombstone();
+
+create index if not exists ix_workout_log_change
+  on workout.workout_log(change_xid, workout_log_id);
+
+create index if not exists ix_workout_log_tombstone_change
+  on workout.workout_log_tombstone(change_xid, workout_log_id);
+
+-- Tombstone retention: prune_tombstones(retain) drops tombstones older than
+-- `retain` and raises the feed horizon to the newest pruned change_xid, in
+-- one transaction. A sync token at or below the horizon may have missed
+-- deletes; the feed answers it with "resync required".
+create table if not exists workout.change_feed_horizon (
+  singleton      boolean primary key default true check (singleton),
+  horizon_xid    xid8 not null,
+  pruned_at      timestamptz not null default now()
+);
+
+create or replace function workout.prune_tombstones(p_retain interval) returns bigint
+language plpgsql as $$
+declare
+  v_horizon xid8;
+  v_deleted bigint;
+begin
+  with pruned as (
+    delete from workout.workout_log_tombstone
+    where deleted_at < now() - p_retain
+    returning change_xid
+  )
+  select max(change_xid), count(*) into v_horizon, v_deleted from pruned;
+
+  if v_horizon is not null then
+    insert into workout.change_feed_horizon (horizon_xid) values (v_horizon)
+    on conflict (singleton) do update
+      set horizon_xid = greatest(workout.change_feed_horizon.horizon_xid, excluded.horizon_xid),
+          pruned_at = now();
+  end if;
+  return v_deleted;
+end $$;
+
+-- Keyset paging of sessions (GET /api/workouts?cursor=...), newest first
+create index if not exists ix_workout_log_date_workout_id
+  on workout.workout_log(workout_date desc, workout_id desc);
+
+-- ---------------------------------------------------------------------------
+-- Personal records, maintained on write (WorkoutTracker app/records.py)
+--
+-- One row per exercise and record type (exercise_pr) and per exercise and
+-- weight (exercise_reps_pr), pointing at the log row that holds it. The
+-- holder is the best value; on a tie, the earliest (workout_date,
+-- workout_log_id). previous_value is the best value before the holder, null
+-- when the holder was the first of its kind, so "PR" means it beat an
+-- earlier record.
+--
+-- pr_apply(log_id) after an insert/update: O(1) when the row is newer than
+-- the current holders, otherwise it falls back to pr_recompute for that
+-- exercise. pr_recompute(exercises) after deletes or date changes (null = all
+-- exercises; also run nightly).
+--
+-- Both take the transaction-scoped advisory lock workout.pr_lock(): record
+-- maintenance is serialized until commit, so concurrent writers (or a write
+-- during the nightly rebuild) never read each other's half-applied records.
+-- Callers run the log write and the record update in one transaction.
+-- ---------------------------------------------------------------------------
+
+create or replace function workout.pr_lock() returns void
+language sql as $$
+  select pg_advisory_xact_lock(hashtext('workout.pr'));
+$$;
+
+-- Per log row: heaviest weight, Epley e1RM of the best set of at most 12
+-- reps, volume (weight x total reps), most reps in one set.
+create or replace view workout.workout_log_metrics as
+select
+  l.workout_log_id,
+  l.workout_id,
+  l.workout_date,
+  l.exercise,
+  coalesce(l.weight_kg, 0) as weight_kg,
+  s.top_reps,
+  case when l.weight_kg > 0 then l.weight_kg end as max_weight,
+  case when l.weight_kg > 0 and s.e1rm_reps is not null then
+    round(l.weight_kg * case when s.e1rm_reps = 1 then 1 else 1 + s.e1rm_reps / 30.0 end, 3)
+  end as e1rm,
+  case when l.weight_kg > 0 then l.weight_kg * s.total_reps end as volume
+from workout.workout_log l
+cross join lateral (
+  select max(r) as top_reps,
+         sum(r) as total_reps,
+         max(r) filter (where r <= 12) as e1rm_reps
+  from unnest(array[l.set1_reps, l.set2_reps, l.set3_reps, l.set4_reps, l.set5_reps]) as r
+  where r > 0
+) s
+where s.top_reps is not null;
+
+create table if not exists workout.exercise_pr (
+  exercise       text not null,
+  record_type    text not null,        -- max_weight / e1rm / volume (kg)
+  value          numeric(14,3) not null,
+  previous_value numeric(14,3) null,
+  workout_log_id bigint not null,
+  workout_id     uuid not null,
+  workout_date   date not null,
+  updated_at     timestamptz not null default now(),
+
+  primary key (exercise, record_type),
+  constraint ck_exercise_pr_type check (record_type in ('max_weight', 'e1rm', 'volume'))
+);
+
+create table if not exists workout.exercise_reps_pr (
+  exercise       text not null,
+  weight_kg      numeric(10,3) not null, -- 0 = bodyweight
+  reps           integer not null,       -- most reps in one set at this weight
+  previous_reps  integer null,
+  workout_log_id bigint not null,
+  workout_id     uuid not null,
+  workout_date   date not null,
+  updated_at     timestamptz not null default now(),
+
+  primary key (exercise, weight_kg)
+);
+
+-- Detail page: records held by the rows of one session
+create index if not exists ix_exercise_pr_log
+  on workout.exercise_pr(workout_log_id);
+
+create index if not exists ix_exercise_reps_pr_log
+  on workout.exercise_reps_pr(workout_log_id);
+
+create or replace function workout.pr_recompute(p_exercises text[]) returns void
+language sql as $$
+  select workout.pr_lock();
+
+  delete from workout.exercise_pr
+  where p_exercises is null or exercise = any(p_exercises);
+
+  delete from workout.exercise_reps_pr
+  where p_exercises is null or exercise = any(p_exercises);
+
+  insert into workout.exercise_pr
+    (exercise, record_type, value, previous_value, workout_log_id, workout_id, workout_date)
+  select exercise, record_type, value, previous_value, workout_log_id, workout_id, workout_date
+  from (
+    select m.exercise, v.record_type, v.value, m.workout_log_id, m.workout_id, m.workout_date,
+           max(v.value) over (
+             partition by m.exercise, v.record_type
+             order by m.workout_date, m.workout_log_id
+             rows between unbounded preceding and 1 preceding
+           ) as previous_value,
+           row_number() over (
+             partition by m.exercise, v.record_type
+             order by v.value desc, m.workout_date, m.workout_log_id
+           ) as rank
+    from workout.workout_log_metrics m
+    cross join lateral (
+      values ('max_weight', m.max_weight), ('e1rm', m.e1rm), ('volume', m.volume)
+    ) as v(record_type, value)
+    where v.value is not null
+      and (p_exercises is null or m.exercise = any(p_exercises))
+  ) ranked
+  where rank = 1;
+
+  insert into workout.exercise_reps_pr
+    (exercise, weight_kg, reps, previous_reps, workout_log_id, workout_id, workout_date)
+  select exercise, weight_kg, top_reps, previous_reps, workout_log_id, workout_id, workout_date
+  from (
+    select m.*,
+           max(m.top_reps) over (
+             partition by m.exercise, m.weight_kg
+             order by m.workout_date, m.workout_log_id
+             rows between unbounded preceding and 1 preceding
+           ) as previous_reps,
+           row_number() over (
+             partition by m.exercise, m.weight_kg
+             order by m.top_reps desc, m.workout_date, m.workout_log_id
+           ) as rank
+    from workout.workout_log_metrics m
+    where p_exercises is null or m.exercise = any(p_exercises)
+  ) ranked
+  where rank = 1;
+$$;
+
+create or replace function workout.pr_apply(p_log_id bigint) returns void
+language plpgsql as $$
+declare
+  m workout.workout_log_metrics%rowtype;
+  affected text[];
+begin
+  perform workout.pr_lock();
+
+  -- The row already holds records (it was updated, maybe to a lower value
+  -- or another exercise): rebuild everything it touches
+  select array_agg(distinct exercise) into affected
+  from (
+    select exercise from workout.exercise_pr where workout_log_id = p_log_id
+    union all
+    select exercise from workout.exercise_reps_pr where workout_log_id = p_log_id
+  ) held;
+
+  select * into m from workout.workout_log_metrics where workout_log_id = p_log_id;
+
+  if affected is not null then
+    perform workout.pr_recompute(array_append(affected, m.exercise));
+    return;
+  end if;
+  if not found then
+    return;  -- deleted meanwhile, or no reps
+  end if;
+
+  -- Back-dated row: it may change previous values or tie-breaks
+  if exists (
+    select 1 from workout.exercise_pr
+    where exercise = m.exercise and (workout_date, workout_log_id) > (m.workout_date, m.workout_log_id)
+    union all
+    select 1 from workout.exercise_reps_pr
+    where exercise = m.exercise and (workout_date, workout_log_id) > (m.workout_date, m.workout_log_id)
+  ) then
+    perform workout.pr_recompute(array[m.exercise]);
+    return;
+  end if;
+
+  insert into workout.exercise_pr as pr
+    (exercise, record_type, value, workout_log_id, workout_id, workout_date)
+  select m.exercise, v.record_type, v.value, m.workout_log_id, m.workout_id, m.workout_date
+  from (values ('max_weight', m.max_weight), ('e1rm', m.e1rm), ('volume', m.volume)) as v(record_type, value)
+  where v.value is not null
+  on conflict (exercise, record_type) do update
+    set previous_value = pr.value,
+        value = excluded.value,
+        workout_log_id = excluded.workout_log_id,
+        workout_id = excluded.workout_id,
+        workout_date = excluded.workout_date,
+        updated_at = now()
+  where excluded.value > pr.value;
+
+  insert into workout.exercise_reps_pr as pr
+    (exercise, weight_kg, reps, workout_log_id, workout_id, workout_date)
+  values (m.exercise, m.weight_kg, m.top_reps, m.workout_log_id, m.workout_id, m.workout_date)
+  on conflict (exercise, weight_kg) do update
+    set previous_reps = pr.reps,
+        reps = excluded.reps,
+        workout_log_id = excluded.workout_log_id,
+        workout_id = excluded.workout_id,
+        workout_date = excluded.workout_date,
+        updated_at = now()
+  where excluded.reps > pr.reps;
+end $$;
+
+-- Backfill (and repair) on every schema apply
+select workout.pr_recompute(null);
+
 commit;
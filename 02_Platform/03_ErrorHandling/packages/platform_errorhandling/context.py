@@ -0,0 +1,15 @@
+"""
+Request context shared with code below the web layer (no FastAPI dependency).
+
+install_exception_handlers sets the request id for the duration of each
+request; anything running inside it (also in threadpool workers) can tag
+logs and diagnostics with current_request_id().
+"""
+from contextvars import ContextVar
+from typing import Optional
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("atlas_request_id", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    return request_id_var.get()
@@ -3,13 +3,20 @@ import uuid
 from fastapi import Request
 from fastapi.responses import JSONResponse, HTMLResponse
 
+from platform_errorhandling.context import request_id_var
+
 log = logging.getLogger("atlas")
 
 def install_exception_handlers(app):
     @app.middleware("http")
     async def attach_request_id(request: Request, call_next):
         request.state.request_id = str(uuid.uuid4())
-        return await call_next(request)
+        # Also visible below the web layer (e.g. slow-query capture)
+        token = request_id_var.set(request.state.request_id)
+        try:
+            return await call_next(request)
+        finally:
+            request_id_var.reset(token)
 
     @app.exception_handler(Exception)
     async def unhandled_exception_handler(request: Request, exc: Exception):
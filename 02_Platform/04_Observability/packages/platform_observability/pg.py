@@ -0,0 +1,96 @@
+"""
+Instrumented psycopg cursors.
+
+Pass as `cursor_factory` when connecting; every execute() becomes an "sql"
+span (statement, duration, row count) in the current trace, and statements
+over the slow-query threshold are captured (see slowquery):
+
+    psycopg.connect(..., cursor_factory=InstrumentedCursor)
+    await psycopg.AsyncConnection.connect(..., cursor_factory=AsyncInstrumentedCursor)
+
+Outside a trace the overhead for fast statements is one perf_counter pair.
+"""
+import re
+import time
+from typing import Any
+
+import psycopg
+
+from platform_observability import slowquery, tracing
+
+_WS = re.compile(r"\s+")
+MAX_STATEMENT_CHARS = 500
+
+
+def statement_text(query: Any) -> str:
+    """Single-line, length-capped statement text for spans and logs."""
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    elif not isinstance(query, str):
+        query = str(query)  # psycopg.sql.Composed etc.
+    return _WS.sub(" ", query).strip()[:MAX_STATEMENT_CHARS]
+
+
+def _record(cursor, query: Any, params: Any, duration_ms: float, error: BaseException | None,
+            batch: bool = False) -> None:
+    rowcount = cursor.rowcount
+    if duration_ms >= slowquery.settings.threshold_ms:
+        slowquery.capture(cursor.connection, query, params, duration_ms, rowcount, error, batch=batch)
+    if tracing.current_span() is None:
+        return
+    attrs = {"statement": statement_text(query), "rows": rowcount}
+    if error is not None:
+        attrs["error"] = type(error).__name__
+    tracing.record_span("sql", duration_ms, **attrs)
+
+
+def _batch_size(params_seq: Any) -> Any:
+    return len(params_seq) if hasattr(params_seq, "__len__") else None
+
+
+class InstrumentedCursor(psycopg.Cursor):
+    def execute(self, query, params=None, **kwargs):
+        start = time.perf_counter()
+        error = None
+        try:
+            return super().execute(query, params, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _record(self, query, params, (time.perf_counter() - start) * 1000, error)
+
+    def executemany(self, query, params_seq, **kwargs):
+        start = time.perf_counter()
+        error = None
+        try:
+            return super().executemany(query, params_seq, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _record(self, query, _batch_size(params_seq), (time.perf_counter() - start) * 1000, error, batch=True)
+
+
+class AsyncInstrumentedCursor(psycopg.AsyncCursor):
+    async def execute(self, query, params=None, **kwargs):
+        start = time.perf_counter()
+        error = None
+        try:
+            return await super().execute(query, params, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _record(self, query, params, (time.perf_counter() - start) * 1000, error)
+
+    async def executemany(self, query, params_seq, **kwargs):
+        start = time.perf_counter()
+        error = None
+        try:
+            return await super().executemany(query, params_seq, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _record(self, query, _batch_size(params_seq), (time.perf_counter() - start) * 1000, error, batch=True)
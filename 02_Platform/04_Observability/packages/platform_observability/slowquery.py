@@ -0,0 +1,326 @@
+"""
+Slow-query capture.
+
+The instrumented cursors (platform_observability.pg) hand every statement
+slower than ATLAS_SLOW_QUERY_MS (default 250; "off" disables) to capture().
+A record holds:
+
+- normalized statement text (literals and placeholders -> ?) + fingerprint
+- parameter shape (types only; values are never stored)
+- duration, row count, error
+- request_id (platform_errorhandling) and trace_id (tracing), when set
+- for a sample of them, the plan: EXPLAIN (ANALYZE, BUFFERS) only for plain
+  SELECTs that call nothing but built-in functions from _SAFE_CALLS; plain
+  EXPLAIN for everything else. ANALYZE executes the statement again, and a
+  SELECT can still write (SELECT workout.pr_apply(...), nextval, FOR UPDATE).
+
+Records are written to platform.slow_query_log
+(02_Platform/01_Postgres/ObjectSchemas/platform_schema.sql) by a background
+thread on its own plain connection, so capture adds no round trips to the
+request and never captures itself. If the queue is full, records are
+dropped (counted in stats()). Rows older than ATLAS_SLOW_QUERY_RETENTION_DAYS
+(default 14) are removed by the scheduler's built-in
+"platform.prune_slow_query_log" job (platform_scheduler).
+
+EXPLAIN sampling: the first slow occurrence of each fingerprint per process,
+then ATLAS_SLOW_QUERY_EXPLAIN_SAMPLE (default 0.1) of the rest. "Seen"
+fingerprints are kept in an LRU of MAX_EXPLAINED_FINGERPRINTS; one evicted
+and seen again simply counts as first again.
+
+    SELECT fingerprint, min(statement), count(*), round(avg(duration_ms)) AS avg_ms
+    FROM platform.slow_query_log
+    WHERE captured_at > now() - interval '7 days'
+    GROUP BY fingerprint ORDER BY sum(duration_ms) DESC;
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Optional
+
+import psycopg
+from psycopg import sql
+
+from platform_observability import tracing
+
+try:
+    from platform_errorhandling.context import current_request_id
+except ImportError:  # platform_errorhandling not deployed with this app
+    def current_request_id() -> Optional[str]:
+        return None
+
+log = logging.getLogger("atlas.slowquery")
+
+MAX_STATEMENT_CHARS = 4000
+MAX_EXPLAINED_FINGERPRINTS = 1024
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)[sbt]|%[sbt]|\$\d+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WS = re.compile(r"\s+")
+_READ_ONLY = re.compile(r"^\s*(select|with|values|table)\b", re.IGNORECASE)
+_DML = re.compile(r"\b(insert|update|delete|merge|into)\b|\bfor\s+(no\s+key\s+)?(update|share|key\s+share)\b",
+                  re.IGNORECASE)
+_CALL = re.compile(r'("?[\w$]+"?(?:\s*\.\s*"?[\w$]+"?)*)\s*\(')
+# Names that may precede "(" in a side-effect-free SELECT: SQL keywords and
+# built-in functions without side effects. Anything else (user functions,
+# schema-qualified calls, nextval, set_config, ...) disables ANALYZE.
+_SAFE_CALLS = frozenset("""
+    select from where and or not in any all some exists values as on using over filter
+    within group by partition order when then else case join lateral array row cast
+    count sum avg min max array_agg string_agg json_agg jsonb_agg bool_and bool_or
+    percentile_cont percentile_disc coalesce nullif greatest least lower upper trim
+    length round floor ceil abs date_trunc date_part extract to_char make_interval
+    json_build_object jsonb_build_object row_number rank dense_rank lag lead
+    first_value last_value generate_series unnest now age to_date to_timestamp concat
+    substring replace split_part array_length jsonb_array_elements jsonb_each
+""".split())
+
+
+def _threshold_from_env() -> float:
+    value = os.environ.get("ATLAS_SLOW_QUERY_MS", "250").strip().lower()
+    return float("inf") if value in ("off", "") else float(value)
+
+
+class Settings:
+    def __init__(self):
+        self.threshold_ms = _threshold_from_env()
+        self.explain_sample = float(os.environ.get("ATLAS_SLOW_QUERY_EXPLAIN_SAMPLE", 0.1))
+        self.app = os.environ.get("ATLAS_APP_NAME")
+
+
+settings = Settings()
+
+
+def configure(app: Optional[str] = None, threshold_ms: Optional[float] = None,
+              explain_sample: Optional[float] = None) -> None:
+    """Override the env defaults (call once at startup)."""
+    if app is not None:
+        settings.app = app
+    if threshold_ms is not None:
+        settings.threshold_ms = threshold_ms
+    if explain_sample is not None:
+        settings.explain_sample = explain_sample
+
+
+# ---------------------------------------------------------------------------
+# Normalization
+# ---------------------------------------------------------------------------
+
+def _query_text(query: Any) -> Optional[str]:
+    if isinstance(query, str):
+        return query
+    if isinstance(query, bytes):
+        return query.decode("utf-8", "replace")
+    return None  # psycopg.sql.Composable: rendered by the writer
+
+
+def normalize(text: str) -> str:
+    """Statement shape: literals and placeholders become ?, IN lists (...)."""
+    text = _STRING.sub("?", text)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _IN_LIST.sub("(...)", text)
+    return _WS.sub(" ", text).strip()[:MAX_STATEMENT_CHARS]
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def analyze_safe(text: str) -> bool:
+    """True for statements EXPLAIN ANALYZE may execute again: plain reads."""
+    if not _READ_ONLY.match(text):
+        return False
+    text = _STRING.sub("''", text)
+    if _DML.search(text):
+        return False
+    return all(name.lower() in _SAFE_CALLS for name in _CALL.findall(text))
+
+
+def params_shape(params: Any) -> Any:
+    """Types of the parameters, never their values."""
+    if params is None:
+        return None
+    if isinstance(params, Mapping):
+        return {k: type(v).__name__ for k, v in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [type(v).__name__ for v in params]
+    return type(params).__name__
+
+
+# ---------------------------------------------------------------------------
+# Capture
+# ---------------------------------------------------------------------------
+
+def _conn_kwargs(connection) -> dict:
+    info = connection.info
+    kwargs = dict(info.get_parameters())
+    if info.password:
+        kwargs["password"] = info.password
+    kwargs.pop("options", None)
+    return kwargs
+
+
+class SlowQueryRecorder:
+    def __init__(self, max_queue: int = 1000):
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        # fingerprint -> None, least recently seen first
+        self._explained: OrderedDict[str, None] = OrderedDict()
+        self._explained_lock = threading.Lock()
+        self._connections: dict[tuple, psycopg.Connection] = {}
+        self.captured = 0
+        self.dropped = 0
+        self.write_errors = 0
+
+    def capture(self, connection, query: Any, params: Any, duration_ms: float,
+                rowcount: int, error: Optional[BaseException], batch: bool = False) -> None:
+        """Queue one slow statement; for executemany (batch) `params` is the batch size."""
+        text = _query_text(query)
+        if text is not None and text.lstrip()[:7].upper() == "EXPLAIN":
+            return
+        normalized = normalize(text) if text is not None else None
+        fp = fingerprint(normalized) if normalized is not None else None
+
+        explain = (
+            error is None and not batch
+            and (self._first_seen(fp) or random.random() < settings.explain_sample)
+        )
+
+        record = {
+            "app": settings.app,
+            "request_id": current_request_id(),
+            "trace_id": tracing.current_trace_id(),
+            "fingerprint": fp,
+            "statement": normalized,
+            "params_shape": {"batch": params} if batch else params_shape(params),
+            "duration_ms": round(duration_ms, 3),
+            "row_count": rowcount if rowcount is not None and rowcount >= 0 else None,
+            "error": type(error).__name__ if error is not None else None,
+        }
+        job = (record, _conn_kwargs(connection), query, params if explain else None, explain)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.captured += 1
+        self._ensure_thread()
+
+    def _first_seen(self, fp: Optional[str]) -> bool:
+        """True the first time fp is seen (or after it fell out of the LRU)."""
+        if fp is None:
+            return True  # Composable: fingerprint only known in the writer
+        with self._explained_lock:
+            if fp in self._explained:
+                self._explained.move_to_end(fp)
+                return False
+            self._explained[fp] = None
+            while len(self._explained) > MAX_EXPLAINED_FINGERPRINTS:
+                self._explained.popitem(last=False)
+            return True
+
+    # -- writer thread --------------------------------------------------------
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="atlas-slowquery", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            record, kwargs, query, params, explain = self._queue.get()
+            try:
+                self._write(record, kwargs, query, params, explain)
+            except Exception as e:
+                self.write_errors += 1
+                if self.write_errors in (1, 10, 100) or self.write_errors % 1000 == 0:
+                    log.warning("Slow-query record not stored (%d so far): %s", self.write_errors, e)
+                self._drop_connection(kwargs)
+
+    def _connection(self, kwargs: dict) -> psycopg.Connection:
+        key = tuple(sorted(kwargs.items()))
+        conn = self._connections.get(key)
+        if conn is None or conn.closed:
+            # Plain cursors: the writer's own statements are not instrumented
+            conn = psycopg.connect(**kwargs, autocommit=True, application_name="atlas-slowquery")
+            self._connections[key] = conn
+        return conn
+
+    def _drop_connection(self, kwargs: dict) -> None:
+        conn = self._connections.pop(tuple(sorted(kwargs.items())), None)
+        if conn is not None:
+            conn.close()
+
+    def _write(self, record: dict, kwargs: dict, query: Any, params: Any, explain: bool) -> None:
+        conn = self._connection(kwargs)
+        if record["statement"] is None:
+            record["statement"] = normalize(query.as_string(conn))
+            record["fingerprint"] = fingerprint(record["statement"])
+
+        plan, plan_error = None, None
+        if explain:
+            plan, plan_error = self._explain(conn, query, params)
+
+        conn.execute(
+            """
+            INSERT INTO platform.slow_query_log (
+                app, request_id, trace_id, fingerprint, statement, params_shape,
+                duration_ms, row_count, error, plan, plan_error
+            ) VALUES (
+                %(app)s, %(request_id)s, %(trace_id)s, %(fingerprint)s, %(statement)s, %(params_shape)s,
+                %(duration_ms)s, %(row_count)s, %(error)s, %(plan)s, %(plan_error)s
+            )
+            """,
+            {
+                **record,
+                "params_shape": json.dumps(record["params_shape"]),
+                "plan": json.dumps(plan) if plan is not None else None,
+                "plan_error": plan_error,
+            },
+        )
+
+    @staticmethod
+    def _explain(conn: psycopg.Connection, query: Any, params: Any) -> tuple[Any, Optional[str]]:
+        text = _query_text(query)
+        if text is None:
+            text = query.as_string(conn)
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze_safe(text) else "FORMAT JSON"
+        try:
+            # A transaction that is always rolled back: even a misclassified
+            # write cannot persist anything.
+            with conn.transaction(force_rollback=True):
+                row = conn.execute(sql.SQL("EXPLAIN ({}) ").format(sql.SQL(options)) + sql.SQL(text),
+                                   params).fetchone()
+            return row[0], None
+        except psycopg.Error as e:
+            return None, f"{type(e).__name__}: {e}"[:500]
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": settings.threshold_ms,
+            "explain_sample": settings.explain_sample,
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "write_errors": self.write_errors,
+        }
+
+
+recorder = SlowQueryRecorder()
+
+
+def capture(*args, **kwargs) -> None:
+    recorder.capture(*args, **kwargs)
@@ -0,0 +1,234 @@
+"""
+In-process request tracing.
+
+A trace is a tree of timed spans rooted at one incoming request. The current
+span lives in a ContextVar, so code further down (auth, tool bodies, SQL
+cursors — also in worker threads started via anyio/asyncio) attaches its
+spans to the right tree without passing anything around.
+
+When no trace is active every helper is a cheap no-op.
+
+Finished traces go to an in-memory ring buffer (query with `recent`/`get`)
+and, when ATLAS_TRACE_EXPORT is set, are appended as JSON lines to that file
+by a background thread (like the slowquery writer), so a request never waits
+on the disk. If the export queue is full, records are dropped (counted in
+buffer.export_dropped). Traces are ephemeral diagnostics, not durable state.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+log = logging.getLogger("atlas.tracing")
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent: Optional["Span"] = None, **attrs: Any):
+        self.name = name
+        self.trace_id = trace_id
+        self.parent = parent
+        self.attrs: dict[str, Any] = attrs
+        self.children: list[Span] = []
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+
+    def child(self, name: str, **attrs: Any) -> "Span":
+        span = Span(name, self.trace_id, self, **attrs)
+        self.children.append(span)
+        return span
+
+    def end(self) -> None:
+        if self.duration_ms is None:
+            self.duration_ms = round((time.perf_counter() - self._start) * 1000, 3)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "attrs": self.attrs,
+            "children": [c.to_dict() for c in self.children],
+        }
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("atlas_current_span", default=None)
+
+
+# ---------------------------------------------------------------------------
+# Ring buffer + export
+# ---------------------------------------------------------------------------
+
+class TraceBuffer:
+    def __init__(self, size: int = 200, export_path: Optional[str] = None, max_queue: int = 1000):
+        self._traces: deque[dict] = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.export_path = export_path
+        self._export_queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._export_thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.export_dropped = 0
+        self.export_errors = 0
+
+    def add(self, root: Span) -> None:
+        record = {"trace_id": root.trace_id, **root.to_dict()}
+        with self._lock:
+            self._traces.append(record)
+        if self.export_path:
+            try:
+                self._export_queue.put_nowait(record)
+            except queue.Full:
+                self.export_dropped += 1
+                return
+            self._ensure_export_thread()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until queued records are written (shutdown, tests); False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._export_queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    # -- export thread --------------------------------------------------------
+
+    def _ensure_export_thread(self) -> None:
+        if self._export_thread is not None:
+            return
+        with self._start_lock:
+            if self._export_thread is None:
+                self._export_thread = threading.Thread(
+                    target=self._export_loop, name="atlas-trace-export", daemon=True)
+                self._export_thread.start()
+
+    def _export_loop(self) -> None:
+        while True:
+            batch = [self._export_queue.get()]
+            # Whatever else is queued goes out with the same open/append
+            while True:
+                try:
+                    batch.append(self._export_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with open(self.export_path, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(record, default=str) + "\n" for record in batch)
+            except Exception as e:
+                self.export_errors += 1
+                if self.export_errors in (1, 10, 100) or self.export_errors % 1000 == 0:
+                    log.warning("Trace export to %s failed (%d so far): %s",
+                                self.export_path, self.export_errors, e)
+            finally:
+                for _ in batch:
+                    self._export_queue.task_done()
+
+    def recent(self, limit: int = 20, name_contains: Optional[str] = None, min_ms: float = 0.0) -> list[dict]:
+        """Newest first. `name_contains` matches the root name or any attr value."""
+        with self._lock:
+            traces = list(self._traces)
+        out = []
+        for t in reversed(traces):
+            if (t["duration_ms"] or 0) < min_ms:
+                continue
+            if name_contains and not (
+                name_contains in t["name"]
+                or any(name_contains in str(v) for v in t["attrs"].values())
+            ):
+                continue
+            out.append(t)
+            if len(out) >= limit:
+                break
+        return out
+
+    def get(self, trace_id: str) -> Optional[dict]:
+        with self._lock:
+            for t in self._traces:
+                if t["trace_id"] == trace_id:
+                    return t
+        return None
+
+
+buffer = TraceBuffer(
+    size=int(os.environ.get("ATLAS_TRACE_BUFFER", 200)),
+    export_path=os.environ.get("ATLAS_TRACE_EXPORT") or None,
+)
+
+
+# ---------------------------------------------------------------------------
+# Span API
+# ---------------------------------------------------------------------------
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current.get()
+    return span.trace_id if span else None
+
+
+@contextmanager
+def trace(name: str, **attrs: Any) -> Iterator[Span]:
+    """Start a new trace (root span); on exit it is stored in the buffer."""
+    root = Span(name, uuid.uuid4().hex, **attrs)
+    token = _current.set(root)
+    try:
+        yield root
+    finally:
+        _current.reset(token)
+        root.end()
+        buffer.add(root)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Child span of the current span; no-op (yields None) outside a trace."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.child(name, **attrs)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        child.end()
+
+
+@contextmanager
+def use_span(parent: Optional[Span]) -> Iterator[None]:
+    """Make `parent` current — for code that runs outside the trace's context."""
+    token = _current.set(parent)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def record_span(name: str, duration_ms: float, **attrs: Any) -> None:
+    """Attach an already-timed leaf span (e.g. one SQL statement) to the current span."""
+    parent = _current.get()
+    if parent is None:
+        return
+    child = parent.child(name, **attrs)
+    child.started_at -= duration_ms / 1000
+    child.duration_ms = round(duration_ms, 3)
+
+
+def annotate(**attrs: Any) -> None:
+    """Add attributes to the current span, if any."""
+    current = _current.get()
+    if current is not None:
+        current.attrs.update(attrs)
@@ -0,0 +1,80 @@
+"""
+Admission control for FastAPI/Starlette apps.
+
+    install_admission_control(app, controller)
+
+Every HTTP request takes a slot keyed by "<METHOD> /<first path segment>"
+(e.g. "GET /api", "POST /workouts"), so per-key limits can keep one kind of
+request from starving the rest. Shed requests get 503 + Retry-After:
+API routes as JSON, page routes as simple HTML (as in logFastapi).
+
+Current slots, queue depth and wait times: GET /api/admission.
+"""
+import logging
+from typing import Iterable
+
+from fastapi.responses import HTMLResponse, JSONResponse
+
+from platform_admission.controller import AdmissionController, Overloaded
+
+log = logging.getLogger("atlas")
+
+STATS_PATH = "/api/admission"
+
+
+def request_key(scope) -> str:
+    segment = scope["path"].lstrip("/").split("/", 1)[0]
+    return f"{scope['method']} /{segment}"
+
+
+def overloaded_response(path: str, exc: Overloaded):
+    headers = {"Retry-After": str(exc.retry_after)}
+    if path.startswith("/api/"):
+        return JSONResponse(
+            status_code=503,
+            headers=headers,
+            content={
+                "error": "overloaded",
+                "retry_after": exc.retry_after,
+                "message": f"Server busy ({exc.reason}). Retry after {exc.retry_after} s.",
+            },
+        )
+    return HTMLResponse(
+        status_code=503,
+        headers=headers,
+        content=(
+            "<h2>Server busy</h2>"
+            f"<p>Please retry in {exc.retry_after} s.</p>"
+        ),
+    )
+
+
+class AdmissionASGIMiddleware:
+    def __init__(self, app, controller: AdmissionController, exempt_prefixes: Iterable[str] = ()):
+        self.app = app
+        self.controller = controller
+        self.exempt_prefixes = tuple(exempt_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_prefixes):
+            return await self.app(scope, receive, send)
+
+        key = request_key(scope)
+        try:
+            async with self.controller.admit(key):
+                await self.app(scope, receive, send)
+        except Overloaded as exc:
+            log.warning("Shed %s %s (%s)", scope["method"], scope["path"], exc)
+            await overloaded_response(scope["path"], exc)(scope, receive, send)
+
+
+def install_admission_control(app, controller: AdmissionController, exempt_prefixes: Iterable[str] = ("/static",)):
+    app.add_middleware(
+        AdmissionASGIMiddleware,
+        controller=controller,
+        exempt_prefixes=(STATS_PATH, *exempt_prefixes),
+    )
+
+    @app.get(STATS_PATH, include_in_schema=False)
+    async def admission_stats():
+        return controller.stats()
@@ -0,0 +1,228 @@
+"""
+Admission control: bounded concurrency with a short, deadline-bounded queue.
+
+Every unit of work (an MCP tool call, an HTTP request) takes a slot before
+it runs and gives it back when done:
+
+    async with controller.admit("get_daily_overview"):
+        ...
+
+A slot needs room under the global limit *and* under the limit of its key
+(tool name, route group). Without room the caller waits in a FIFO queue and
+is admitted as soon as a slot its key can use frees up, so one saturated
+key does not hold up the others. The queue is short on purpose — overload
+is shed at the door instead of piling up as open Postgres connections:
+
+- queue full                  -> Overloaded immediately
+- no slot within max_wait     -> Overloaded at the deadline
+
+Overloaded.retry_after (whole seconds) is estimated from the recent mean
+hold time and the queue ahead; surface it as Retry-After / in tool errors.
+
+Limits are per process (one event loop): with N workers the effective
+global limit is N x max_concurrency.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+MAX_RETRY_AFTER_SECONDS = 60
+
+
+class Overloaded(Exception):
+    """Work was not admitted; try again after `retry_after` seconds."""
+
+    def __init__(self, key: str, reason: str, retry_after: int):
+        super().__init__(f"{key}: {reason}, retry after {retry_after} s")
+        self.key = key
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("key", "future")
+
+    def __init__(self, key: str, future: asyncio.Future):
+        self.key = key
+        self.future = future
+
+
+def parse_limits(text: Optional[str]) -> dict[str, int]:
+    """Per-key limits from config text: "get_daily_overview=2,log_meal=1"."""
+    limits = {}
+    for item in (text or "").split(","):
+        if item.strip():
+            key, _, value = item.rpartition("=")
+            limits[key.strip()] = int(value)
+    return limits
+
+
+def _percentile(sorted_ms: list[float], pct: float) -> Optional[float]:
+    if not sorted_ms:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_ms))))
+    return round(sorted_ms[rank - 1], 2)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_queue: int = 32,
+        max_wait_seconds: float = 2.0,
+        per_key_limit: Optional[int] = None,
+        key_limits: Optional[dict[str, int]] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        # Limit for keys not in key_limits; None = only the global limit applies
+        self.per_key_limit = per_key_limit
+        self.key_limits: dict[str, int] = dict(key_limits or {})
+        self._in_flight = 0
+        self._key_in_flight: dict[str, int] = {}
+        self._waiters: deque[_Waiter] = deque()
+        self._hold_ewma: Optional[float] = None
+        self._waits_ms: deque[float] = deque(maxlen=1024)
+        self._counters: dict[str, dict[str, int]] = {}
+        self.peak_waiting = 0
+
+    # -- limits ---------------------------------------------------------------
+
+    def limit_for(self, key: str) -> Optional[int]:
+        return self.key_limits.get(key, self.per_key_limit)
+
+    def set_limit(self, key: str, limit: Optional[int]) -> None:
+        """Set (or with None, drop) the concurrency limit of one key."""
+        if limit is None:
+            self.key_limits.pop(key, None)
+        else:
+            self.key_limits[key] = limit
+
+    def _has_room(self, key: str) -> bool:
+        if self._in_flight >= self.max_concurrency:
+            return False
+        limit = self.limit_for(key)
+        return limit is None or self._key_in_flight.get(key, 0) < limit
+
+    # -- slots ----------------------------------------------------------------
+
+    def _acquire(self, key: str) -> None:
+        self._in_flight += 1
+        self._key_in_flight[key] = self._key_in_flight.get(key, 0) + 1
+
+    def _release(self, key: str, held_seconds: Optional[float]) -> None:
+        self._in_flight -= 1
+        self._key_in_flight[key] -= 1
+        if held_seconds is not None:
+            self._hold_ewma = held_seconds if self._hold_ewma is None else (
+                0.8 * self._hold_ewma + 0.2 * held_seconds)
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand free slots to the oldest waiters that can use them."""
+        for waiter in list(self._waiters):
+            if self._in_flight >= self.max_concurrency:
+                break
+            if self._has_room(waiter.key):
+                self._waiters.remove(waiter)
+                self._acquire(waiter.key)
+                waiter.future.set_result(None)
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        if waiter.future.done() and not waiter.future.cancelled():
+            # Granted just as the waiter gave up: pass the slot on
+            self._release(waiter.key, None)
+        else:
+            waiter.future.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def _count(self, key: str, counter: str) -> None:
+        counters = self._counters.setdefault(
+            key, {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_deadline": 0})
+        counters[counter] += 1
+
+    def retry_after(self) -> int:
+        """Seconds until a retry is likely to be admitted (at least 1)."""
+        hold = self._hold_ewma if self._hold_ewma is not None else 1.0
+        ahead = len(self._waiters) + 1
+        return min(MAX_RETRY_AFTER_SECONDS, max(1, math.ceil(hold * ahead / self.max_concurrency)))
+
+    @asynccontextmanager
+    async def admit(self, key: str = "*") -> AsyncIterator[float]:
+        """
+        Hold one slot for `key` for the duration of the block; yields the
+        seconds spent waiting. Raises Overloaded if not admitted in time.
+        """
+        start = time.perf_counter()
+        if self._has_room(key):
+            self._acquire(key)
+        else:
+            if len(self._waiters) >= self.max_queue:
+                self._count(key, "rejected_queue_full")
+                raise Overloaded(key, "queue full", self.retry_after())
+            waiter = _Waiter(key, asyncio.get_running_loop().create_future())
+            self._waiters.append(waiter)
+            self.peak_waiting = max(self.peak_waiting, len(self._waiters))
+            self._count(key, "queued")
+            try:
+                # asyncio.wait, not wait_for: a timeout must not cancel a grant
+                await asyncio.wait((waiter.future,), timeout=self.max_wait_seconds)
+            except BaseException:
+                self._abandon(waiter)
+                raise
+            if not waiter.future.done():
+                self._abandon(waiter)
+                self._count(key, "rejected_deadline")
+                raise Overloaded(key, "no slot within deadline", self.retry_after())
+
+        admitted = time.perf_counter()
+        self._waits_ms.append((admitted - start) * 1000)
+        self._count(key, "admitted")
+        try:
+            yield admitted - start
+        finally:
+            self._release(key, time.perf_counter() - admitted)
+
+    # -- metrics --------------------------------------------------------------
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits_ms)
+        waiting: dict[str, int] = {}
+        for waiter in self._waiters:
+            waiting[waiter.key] = waiting.get(waiter.key, 0) + 1
+        keys = {
+            key: {
+                "limit": self.limit_for(key),
+                "in_flight": self._key_in_flight.get(key, 0),
+                "waiting": waiting.get(key, 0),
+                **counters,
+            }
+            for key, counters in sorted(self._counters.items())
+        }
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait_seconds,
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiters),
+            "peak_waiting": self.peak_waiting,
+            "admitted": sum(c["admitted"] for c in self._counters.values()),
+            "rejected": sum(
+                c["rejected_queue_full"] + c["rejected_deadline"] for c in self._counters.values()),
+            "wait_ms": {
+                "samples": len(waits),
+                "p50": _percentile(waits, 50),
+                "p99": _percentile(waits, 99),
+                "max": round(waits[-1], 2) if waits else None,
+            },
+            "mean_hold_ms": round(self._hold_ewma * 1000, 2) if self._hold_ewma is not None else None,
+            "retry_after_hint": self.retry_after(),
+            "keys": keys,
+        }
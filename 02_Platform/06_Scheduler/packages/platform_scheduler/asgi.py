@@ -0,0 +1,42 @@
+"""
+Run a Scheduler for the lifetime of an ASGI app.
+
+    install_scheduler(app, scheduler)             # FastAPI/Starlette
+    http_app = SchedulerLifespan(http_app, scheduler)   # any ASGI app
+
+The scheduler starts on lifespan startup and stops on shutdown, so
+importing the app (tests, tooling) does not start background work.
+install_scheduler also adds GET /api/scheduler: this process's jobs and
+the latest runs from platform.job_run.
+"""
+from platform_scheduler.scheduler import Scheduler
+
+STATUS_PATH = "/api/scheduler"
+
+
+class SchedulerLifespan:
+    def __init__(self, app, scheduler: Scheduler):
+        self.app = app
+        self.scheduler = scheduler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "lifespan":
+            return await self.app(scope, receive, send)
+
+        async def receive_and_track():
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.scheduler.start()
+            elif message["type"] == "lifespan.shutdown":
+                self.scheduler.stop()
+            return message
+
+        await self.app(scope, receive_and_track, send)
+
+
+def install_scheduler(app, scheduler: Scheduler):
+    app.add_middleware(SchedulerLifespan, scheduler=scheduler)
+
+    @app.get(STATUS_PATH, include_in_schema=False)
+    def scheduler_status(limit: int = 20):
+        return {**scheduler.status(), "recent_runs": scheduler.history(limit=limit)}
@@ -0,0 +1,64 @@
+"""
+Reusable maintenance job bodies.
+
+    scheduler.add_job("workouttracker.analyze",
+                      lambda: analyze_if_changed(get_connection, ["workout.workout_log"]),
+                      every=timedelta(minutes=15))
+"""
+from typing import Callable, Iterable
+
+from psycopg import sql
+
+
+def analyze_if_changed(connect: Callable, tables: Iterable[str], min_changes: int = 500) -> dict:
+    """
+    ANALYZE each table ("schema.table") with at least min_changes rows
+    modified since its last analyze.
+
+    Autovacuum analyzes only after 10% of a table changed; a bulk import
+    into a large table leaves the planner on stale statistics until then.
+    Returns {table: rows modified} for the tables analyzed.
+    """
+    analyzed = {}
+    with connect() as conn:
+        for table in tables:
+            schema, _, name = table.rpartition(".")
+            row = conn.execute(
+                """
+                SELECT n_mod_since_analyze
+                FROM pg_stat_user_tables
+                WHERE schemaname = %s AND relname = %s
+                """,
+                (schema or "public", name),
+            ).fetchone()
+            if row is None:
+                continue
+            changed = row["n_mod_since_analyze"] if isinstance(row, dict) else row[0]
+            if changed >= min_changes:
+                conn.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(schema or "public", name)))
+                analyzed[table] = changed
+    return analyzed
+
+
+def prune_slow_query_log(connect: Callable, retention_days: int, batch_size: int = 10_000) -> dict:
+    """
+    Delete platform.slow_query_log rows older than retention_days, in batches
+    so a large backlog never holds one long delete.
+    """
+    deleted = 0
+    with connect() as conn:
+        while True:
+            cur = conn.execute(
+                """
+                DELETE FROM platform.slow_query_log
+                WHERE slow_query_log_id IN (
+                    SELECT slow_query_log_id FROM platform.slow_query_log
+                    WHERE captured_at < now() - make_interval(days => %s)
+                    LIMIT %s
+                )
+                """,
+                (retention_days, batch_size),
+            )
+            deleted += cur.rowcount
+            if cur.rowcount < batch_size:
+                return {"deleted": deleted}
@@ -0,0 +1,312 @@
+"""
+Background jobs with a Postgres lease and run history.
+
+    scheduler = Scheduler(app="workouttracker", connect=get_connection)
+    scheduler.add_job("workouttracker.analyze", analyze, every=timedelta(minutes=15))
+    scheduler.add_job("workouttracker.nightly", nightly, cron="30 3 * * *")
+    scheduler.start()          # or install_scheduler(app, scheduler) (asgi.py)
+
+Jobs are plain functions without arguments; whatever they return (a dict
+of counts, say) is stored with the run. They run one at a time on a
+daemon thread, so a job never blocks a request, and a long job only
+delays the other jobs of the same process.
+
+Every fire time ("slot", see schedules.py) is claimed in
+platform.job_lease before the job runs. The claim succeeds for one
+instance only: the lease must have expired and the slot must be newer
+than the last claimed one. The lease lasts max_runtime; if the process
+dies mid-run, the lease runs out and the next slot is claimed normally.
+Slots that pass while no instance is running are skipped, not caught up.
+
+Each claimed run is a row in platform.job_run (running -> ok | error, with
+duration, error text and the job's result). Rows older than
+ATLAS_SCHEDULER_HISTORY_DAYS (default 30) are removed by the built-in
+"platform.prune_job_history" job; the built-in
+"platform.prune_slow_query_log" job keeps platform.slow_query_log to
+ATLAS_SLOW_QUERY_RETENTION_DAYS (default 14). Built-in jobs share their
+lease across apps, so each runs once per slot platform-wide.
+
+    SELECT job_name, status, started_at, duration_ms, error
+    FROM platform.job_run ORDER BY started_at DESC LIMIT 20;
+
+Env: ATLAS_SCHEDULER=off disables start(); ATLAS_SCHEDULER_TZ (default UTC)
+is the timezone of cron expressions.
+Tables: 02_Platform/01_Postgres/ObjectSchemas/platform_schema.sql.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional, Union
+from zoneinfo import ZoneInfo
+
+import psycopg
+from psycopg.rows import dict_row
+
+from platform_scheduler.maintenance import prune_slow_query_log
+from platform_scheduler.schedules import CronSchedule, IntervalSchedule
+
+log = logging.getLogger("atlas.scheduler")
+
+MAX_ERROR_CHARS = 2000
+
+
+def connect_from_env() -> psycopg.Connection:
+    """Connection from the Atlas ATLAS_PG_* variables (same target as the apps)."""
+    return psycopg.connect(
+        host="127.0.0.1",
+        port=int(os.environ.get("ATLAS_PG_PORT", 5432)),
+        dbname=os.environ["ATLAS_PG_DB"],
+        user=os.environ["ATLAS_PG_USER"],
+        password=os.environ["ATLAS_PG_PASSWORD"],
+        autocommit=True,
+    )
+
+
+class Job:
+    def __init__(self, name: str, fn: Callable[[], Any], schedule, max_runtime: timedelta):
+        self.name = name
+        self.fn = fn
+        self.schedule = schedule
+        self.max_runtime = max_runtime
+        self.next_due: Optional[datetime] = None
+        # This process only; the full history is in platform.job_run
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_status: Optional[str] = None
+        self.last_started_at: Optional[datetime] = None
+        self.last_duration_ms: Optional[float] = None
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "schedule": str(self.schedule),
+            "next_due": self.next_due.isoformat() if self.next_due else None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_status": self.last_status,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_duration_ms": self.last_duration_ms,
+        }
+
+
+class Scheduler:
+    def __init__(
+        self,
+        app: str,
+        connect: Optional[Callable[[], psycopg.Connection]] = None,
+        poll_seconds: float = 30.0,
+        tz: Optional[str] = None,
+        history_days: Optional[int] = None,
+    ):
+        self.app = app
+        self.connect = connect or connect_from_env
+        self.poll_seconds = poll_seconds
+        self.tz = ZoneInfo(tz or os.environ.get("ATLAS_SCHEDULER_TZ", "UTC"))
+        self.owner = f"{app}@{socket.gethostname()}:{os.getpid()}"
+        self.jobs: dict[str, Job] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.history_days = history_days or int(os.environ.get("ATLAS_SCHEDULER_HISTORY_DAYS", 30))
+        self.add_job("platform.prune_job_history", self.prune_history, cron="45 2 * * *")
+        self.slow_query_days = int(os.environ.get("ATLAS_SLOW_QUERY_RETENTION_DAYS", 14))
+        self.add_job("platform.prune_slow_query_log",
+                     lambda: prune_slow_query_log(self.connect, self.slow_query_days),
+                     cron="50 2 * * *")
+
+    def add_job(
+        self,
+        name: str,
+        fn: Callable[[], Any],
+        cron: Optional[str] = None,
+        every: Union[timedelta, float, None] = None,
+        max_runtime: timedelta = timedelta(minutes=10),
+    ) -> Job:
+        """Register fn under a unique name; exactly one of cron / every."""
+        if (cron is None) == (every is None):
+            raise ValueError(f"Job {name}: give exactly one of cron= or every=")
+        if name in self.jobs:
+            raise ValueError(f"Job {name} is already registered")
+        schedule = CronSchedule(cron) if cron is not None else IntervalSchedule(every)
+        job = Job(name, fn, schedule, max_runtime)
+        job.next_due = schedule.next_after(self._now())
+        self.jobs[name] = job
+        log.info("Scheduled %s (%s)", name, schedule)
+        return job
+
+    def _now(self) -> datetime:
+        return datetime.now(self.tz)
+
+    # -- lifecycle -------------------------------------------------------------
+
+    def start(self) -> None:
+        if os.environ.get("ATLAS_SCHEDULER", "on").strip().lower() == "off":
+            log.info("Scheduler disabled (ATLAS_SCHEDULER=off)")
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=f"atlas-scheduler-{self.app}", daemon=True)
+        self._thread.start()
+        log.info("Scheduler started as %s with %d jobs", self.owner, len(self.jobs))
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            now = self._now()
+            for job in self.jobs.values():
+                if self._stop.is_set():
+                    break
+                if job.next_due <= now:
+                    slot = job.next_due
+                    job.next_due = job.schedule.next_after(self._now())
+                    try:
+                        self.run_slot(job, slot)
+                    except Exception:
+                        # One bad slot must not end the thread: skip it
+                        log.exception("Job %s: slot %s skipped", job.name, slot)
+            wake = min(job.next_due for job in self.jobs.values())
+            self._stop.wait(min(self.poll_seconds, max((wake - self._now()).total_seconds(), 0.0)))
+
+    # -- one run ---------------------------------------------------------------
+
+    def run_slot(self, job: Job, slot: datetime) -> Optional[str]:
+        """Claim the slot and run the job; returns the run status, None if not claimed."""
+        try:
+            with self.connect() as conn:
+                claimed = self._claim(conn, job, slot)
+                if not claimed:
+                    job.skipped += 1
+                    return None
+                run_id = self._insert_run(conn, job, slot)
+        except Exception as e:
+            # psycopg.Error, or whatever the app's connect() wraps it in
+            log.warning("Job %s: lease not available (%s)", job.name, e)
+            return None
+
+        started = self._now()
+        start = time.perf_counter()
+        result, error = None, None
+        try:
+            result = job.fn()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"[:MAX_ERROR_CHARS]
+            log.exception("Job %s failed", job.name)
+        duration_ms = round((time.perf_counter() - start) * 1000, 3)
+        status = "ok" if error is None else "error"
+
+        job.runs += 1
+        job.failures += error is not None
+        job.last_status = status
+        job.last_started_at = started
+        job.last_duration_ms = duration_ms
+        log.info("Job %s %s in %.0f ms", job.name, status, duration_ms)
+
+        try:
+            with self.connect() as conn:
+                self._finish_run(conn, job, run_id, status, duration_ms, error, result)
+        except Exception as e:
+            log.warning("Job %s: run %s not recorded (%s)", job.name, run_id, e)
+        return status
+
+    def _claim(self, conn, job: Job, slot: datetime) -> bool:
+        row = conn.execute(
+            """
+            INSERT INTO platform.job_lease (job_name, owner, leased_until, last_slot, updated_at)
+            VALUES (%(job)s, %(owner)s, now() + %(lease)s, %(slot)s, now())
+            ON CONFLICT (job_name) DO UPDATE
+               SET owner = excluded.owner,
+                   leased_until = excluded.leased_until,
+                   last_slot = excluded.last_slot,
+                   updated_at = now()
+             WHERE platform.job_lease.leased_until < now()
+               AND (platform.job_lease.last_slot IS NULL
+                    OR platform.job_lease.last_slot < excluded.last_slot)
+            RETURNING job_name
+            """,
+            {"job": job.name, "owner": self.owner, "lease": job.max_runtime, "slot": slot},
+        ).fetchone()
+        return row is not None
+
+    def _insert_run(self, conn, job: Job, slot: datetime) -> int:
+        row = conn.execute(
+            """
+            INSERT INTO platform.job_run (job_name, app, owner, scheduled_for)
+            VALUES (%s, %s, %s, %s)
+            RETURNING job_run_id
+            """,
+            (job.name, self.app, self.owner, slot),
+        ).fetchone()
+        return row["job_run_id"] if isinstance(row, dict) else row[0]
+
+    def _finish_run(self, conn, job: Job, run_id: int, status: str, duration_ms: float,
+                    error: Optional[str], result: Any) -> None:
+        conn.execute(
+            """
+            UPDATE platform.job_run
+               SET finished_at = now(), status = %s, duration_ms = %s, error = %s, result = %s
+             WHERE job_run_id = %s
+            """,
+            (status, duration_ms, error,
+             json.dumps(result, default=str) if result is not None else None, run_id),
+        )
+        # Release early so the next slot is not held up by the lease
+        conn.execute(
+            "UPDATE platform.job_lease SET leased_until = now(), updated_at = now() "
+            "WHERE job_name = %s AND owner = %s",
+            (job.name, self.owner),
+        )
+
+    # -- introspection / built-in job -----------------------------------------
+
+    def status(self) -> dict:
+        return {
+            "app": self.app,
+            "owner": self.owner,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "timezone": str(self.tz),
+            "jobs": [job.status() for job in self.jobs.values()],
+        }
+
+    def history(self, limit: int = 50, job_name: Optional[str] = None) -> list[dict]:
+        """Latest runs of this app's jobs (all instances), newest first."""
+        with self.connect() as conn:
+            with conn.cursor(row_factory=dict_row) as cur:
+                cur.execute(
+                    """
+                    SELECT job_run_id, job_name, owner, scheduled_for, started_at, finished_at,
+                           duration_ms, status, error, result
+                    FROM platform.job_run
+                    WHERE job_name = ANY(%s)
+                    ORDER BY started_at DESC
+                    LIMIT %s
+                    """,
+                    ([job_name] if job_name else list(self.jobs), limit),
+                )
+                rows = cur.fetchall()
+        for row in rows:
+            for key in ("scheduled_for", "started_at", "finished_at"):
+                if row[key] is not None:
+                    row[key] = row[key].isoformat()
+            if row["duration_ms"] is not None:
+                row["duration_ms"] = float(row["duration_ms"])
+        return rows
+
+    def prune_history(self) -> dict:
+        with self.connect() as conn:
+            cur = conn.execute(
+                "DELETE FROM platform.job_run WHERE started_at < now() - %s",
+                (timedelta(days=self.history_days),),
+            )
+            return {"deleted": cur.rowcount}
@@ -0,0 +1,111 @@
+"""
+When a job is due: cron expressions and fixed intervals.
+
+Both answer one question, next_after(dt) -> the first fire time strictly
+after dt (timezone-aware). Fire times are deterministic (cron fields,
+intervals aligned to the Unix epoch), so every instance of an app computes
+the same slots and the lease in platform.job_lease can hand each slot out
+exactly once.
+
+Cron: five fields "minute hour day-of-month month day-of-week" with
+*, lists (1,15), ranges (1-5), steps (*/10, 0-30/5); day-of-week 0-7
+(0 and 7 = Sunday). As in classic cron, when both day fields are
+restricted a day matches if either does. Aliases: @hourly, @daily,
+@weekly, @monthly.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Union
+
+ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+# (name, lowest, highest)
+_FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    ("day of week", 0, 7),
+)
+
+# Enough to find a match for any valid expression (e.g. "0 0 29 2 *" within 8 years)
+_MAX_STEPS = 100_000
+
+
+def _parse_field(text: str, name: str, low: int, high: int) -> frozenset[int]:
+    values = set()
+    for part in text.split(","):
+        base, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            start_text, _, end_text = base.partition("-")
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(base)
+            end = high if step_text else start
+        if not (low <= start <= end <= high) or step < 1:
+            raise ValueError(f"Invalid {name} field: {text!r}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        parsed = [_parse_field(text, *spec) for text, spec in zip(fields, _FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # cron Sunday is 0 (or 7); Python's isoweekday() % 7 gives Sunday = 0
+        self.weekdays = frozenset(d % 7 for d in weekdays)
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self.days
+        weekday_ok = dt.isoweekday() % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, dt: datetime) -> datetime:
+        # Wall-clock arithmetic in dt's timezone
+        tz = dt.tzinfo
+        t = dt.replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(_MAX_STEPS):
+            if t.month not in self.months:
+                t = (t.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t.replace(tzinfo=tz)
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+    def __str__(self) -> str:
+        return f"cron {self.expression}"
+
+
+class IntervalSchedule:
+    def __init__(self, every: Union[timedelta, float]):
+        seconds = every.total_seconds() if isinstance(every, timedelta) else float(every)
+        if seconds < 1:
+            raise ValueError("Interval must be at least one second")
+        self.seconds = seconds
+
+    def next_after(self, dt: datetime) -> datetime:
+        periods = int(dt.timestamp() // self.seconds) + 1
+        return datetime.fromtimestamp(periods * self.seconds, tz=timezone.utc).astimezone(dt.tzinfo)
+
+    def __str__(self) -> str:
+        return f"every {self.seconds:g} s"
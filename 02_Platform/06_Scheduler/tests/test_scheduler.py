@@ -0,0 +1,64 @@
+import threading
+import time
+from datetime import timedelta
+
+from platform_scheduler.scheduler import Scheduler
+
+
+def _failing_connect(calls):
+    def connect():
+        calls.append(time.monotonic())
+        # What an app's get_connection raises when Postgres is down
+        raise RuntimeError("Database connection failed: connection refused")
+    return connect
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_run_slot_survives_connect_error():
+    calls = []
+    scheduler = Scheduler(app="test", connect=_failing_connect(calls))
+    ran = []
+    job = scheduler.add_job("test.job", lambda: ran.append(1), every=timedelta(minutes=1))
+
+    assert scheduler.run_slot(job, job.next_due) is None
+    assert calls and not ran
+
+
+def test_loop_keeps_running_after_failed_slots(monkeypatch):
+    monkeypatch.delenv("ATLAS_SCHEDULER", raising=False)
+    calls = []
+    scheduler = Scheduler(app="test", connect=_failing_connect(calls), poll_seconds=0.05)
+    job = scheduler.add_job("test.job", lambda: None, every=timedelta(minutes=1))
+    broken = scheduler.add_job("test.broken", lambda: None, every=timedelta(minutes=1))
+
+    original = scheduler.run_slot
+
+    def run_slot(j, slot):
+        if j is broken:
+            raise ValueError("bad slot")
+        return original(j, slot)
+
+    monkeypatch.setattr(scheduler, "run_slot", run_slot)
+    now = scheduler._now()
+    for j in scheduler.jobs.values():
+        j.next_due = now - timedelta(seconds=1)
+
+    scheduler.start()
+    try:
+        assert _wait_for(lambda: len(calls) >= len(scheduler.jobs) - 1)
+        assert _wait_for(lambda: broken.next_due > now)
+        time.sleep(0.1)
+        assert scheduler.status()["running"] is True
+        assert any(t.name == "atlas-scheduler-test" for t in threading.enumerate())
+    finally:
+        scheduler.stop()
+    assert scheduler.status()["running"] is False
+    assert job.runs == 0
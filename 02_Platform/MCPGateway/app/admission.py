@@ -0,0 +1,41 @@
+"""
+Gateway admission control (see platform_admission.controller).
+
+Each tools/call takes a slot keyed by the tool name before it can open a
+Postgres connection. Per-tool limits come from the manifest
+("max_concurrency") or MCP_ADMISSION_TOOL_LIMITS; gateway_* introspection
+tools are exempt so overload stays observable.
+
+A shed call returns an MCP tool error (isError) whose text carries the
+retry hint and whose _meta holds it machine-readably:
+
+    {"overloaded": true, "reason": "queue full", "retry_after": 2}
+"""
+from typing import Any, Iterable
+
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools import ToolResult
+from platform_admission.controller import AdmissionController, Overloaded
+from platform_observability import tracing
+
+
+class AdmissionMiddleware(Middleware):
+    def __init__(self, controller: AdmissionController, exempt_prefixes: Iterable[str] = ("gateway_",)):
+        self.controller = controller
+        self.exempt_prefixes = tuple(exempt_prefixes)
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        name = context.message.name
+        if name.startswith(self.exempt_prefixes):
+            return await call_next(context)
+        try:
+            async with self.controller.admit(name) as waited:
+                tracing.annotate(admission_wait_ms=round(waited * 1000, 2))
+                return await call_next(context)
+        except Overloaded as exc:
+            tracing.annotate(admission="rejected", admission_reason=exc.reason)
+            return ToolResult(
+                content=f"Gateway overloaded ({exc.reason}); retry {name} after {exc.retry_after} s.",
+                meta={"overloaded": True, "reason": exc.reason, "retry_after": exc.retry_after},
+                is_error=True,
+            )
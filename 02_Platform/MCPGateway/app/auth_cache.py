@@ -0,0 +1,199 @@
+"""
+Validated-token cache for the gateway auth provider.
+
+Without it every MCP request pays the provider's validation cost (for
+GoogleProvider: a round trip to Google) before any tool runs. With it only
+the first request per token does; later requests are a dict lookup.
+
+- Accepted tokens are cached for at most `max_ttl_seconds` (default 60),
+  at most `lifetime_fraction` (1/4) of the token's remaining lifetime, and
+  never into the provider's refresh window (OAuthProxy
+  token_expiry_threshold_seconds), so the proxy's transparent upstream
+  refresh still runs before the upstream token expires.
+- Rejected tokens are cached for `negative_ttl_seconds` only when the
+  rejection is confirmed locally: for the OAuth proxy, the gateway's own
+  JWT fails verification (bad signature, expired). A None after a valid
+  JWT can come from an upstream or network failure; it is not cached, so a
+  Google hiccup does not lock a valid user out.
+- The cache is LRU-bounded by `max_entries`.
+- Concurrent requests with the same uncached token share one validation.
+  It runs as its own task that every caller awaits through shield(), so a
+  cancelled request (client gone) never cancels or fails the others.
+
+Revocation trade-off: a cached token skips the provider's checks, so an
+upstream revocation (user removes the app's access at Google) takes effect
+after at most the positive TTL (default 60 s). Revocation through the
+gateway's own revoke endpoint drops the cache entry immediately.
+
+Tokens are keyed by SHA-256 digest; raw tokens are never stored.
+Ephemeral runtime state only: a restart simply revalidates.
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from platform_observability import tracing
+
+VerifyFn = Callable[[str], Awaitable[Optional[Any]]]
+
+
+class TokenCache:
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_ttl_seconds: float = 60.0,
+        negative_ttl_seconds: float = 30.0,
+        lifetime_fraction: float = 0.25,
+    ):
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.lifetime_fraction = lifetime_fraction
+        # Seconds before expires_at the provider refreshes upstream (set by install)
+        self.refresh_margin_seconds = 0.0
+        # digest -> (valid_until epoch seconds, AccessToken or None)
+        self._entries: OrderedDict[str, tuple[float, Optional[Any]]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def _lookup(self, digest: str) -> tuple[bool, Optional[Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(digest)
+            if entry[1] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, entry[1]
+
+    def _store(self, digest: str, access_token: Optional[Any]) -> None:
+        now = time.time()
+        if access_token is None:
+            valid_until = now + self.negative_ttl_seconds
+        else:
+            valid_until = now + self.max_ttl_seconds
+            expires_at = getattr(access_token, "expires_at", None)
+            if expires_at is not None:
+                expires_at = float(expires_at)
+                valid_until = min(
+                    valid_until,
+                    now + (expires_at - now) * self.lifetime_fraction,
+                    expires_at - self.refresh_margin_seconds,
+                )
+            if valid_until <= now:
+                return
+        with self._lock:
+            self._entries[digest] = (valid_until, access_token)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(self._digest(token), None)
+
+    async def verify(
+        self,
+        token: str,
+        verify_fn: VerifyFn,
+        confirm_invalid: Optional[Callable[[str], bool]] = None,
+    ) -> Optional[Any]:
+        """
+        Return the cached verdict for `token`, calling `verify_fn` on a miss.
+        A None from verify_fn is cached only if confirm_invalid(token) is true.
+        """
+        digest = self._digest(token)
+        found, access_token = self._lookup(digest)
+        tracing.annotate(cache="hit" if found else "miss")
+        if found:
+            return access_token
+
+        task = self._inflight.get(digest)
+        if task is None:
+            task = asyncio.ensure_future(self._validate(digest, token, verify_fn, confirm_invalid))
+            self._inflight[digest] = task
+            task.add_done_callback(lambda done: self._finished(digest, done))
+        return await asyncio.shield(task)
+
+    async def _validate(
+        self,
+        digest: str,
+        token: str,
+        verify_fn: VerifyFn,
+        confirm_invalid: Optional[Callable[[str], bool]],
+    ) -> Optional[Any]:
+        # An exception (upstream failure) is not a verdict on the token: not cached
+        access_token = await verify_fn(token)
+        if access_token is not None or (confirm_invalid is not None and confirm_invalid(token)):
+            self._store(digest, access_token)
+        return access_token
+
+    def _finished(self, digest: str, task: asyncio.Future) -> None:
+        if self._inflight.get(digest) is task:
+            del self._inflight[digest]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller has gone
+
+    def install(self, provider: Any) -> Any:
+        """
+        Route `provider.verify_token` through this cache.
+
+        Works for any FastMCP auth provider / token verifier: the HTTP auth
+        middleware looks the method up on the instance per request. For the
+        OAuth proxy (GoogleProvider) rejections are confirmed against the
+        proxy's JWT issuer and revoke_token drops the cached entry; other
+        providers get no negative caching.
+        """
+        upstream = provider.verify_token
+        self.refresh_margin_seconds = float(getattr(provider, "_token_expiry_threshold_seconds", 0) or 0)
+
+        def confirm_invalid(token: str) -> bool:
+            issuer = getattr(provider, "_jwt_issuer", None)
+            if issuer is None:
+                return False
+            try:
+                issuer.verify_token(token)
+            except Exception:
+                return True  # not a valid gateway JWT: no upstream state can change that
+            return False
+
+        async def verify_token(token: str):
+            with tracing.span("auth"):
+                return await self.verify(token, upstream, confirm_invalid)
+
+        provider.verify_token = verify_token
+
+        upstream_revoke = getattr(provider, "revoke_token", None)
+        if upstream_revoke is not None:
+            async def revoke_token(token):
+                self.invalidate(token.token)
+                return await upstream_revoke(token)
+
+            provider.revoke_token = revoke_token
+        return provider
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+            }
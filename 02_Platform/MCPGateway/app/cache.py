@@ -0,0 +1,253 @@
+"""
+Read-through result cache for MCP tools.
+
+Platform capability: the gateway caches results of tools that are marked
+read-only and drops them again when a write tool touches the same data.
+No domain knowledge — applications only say which tools are read-only and
+which read tools a write tool invalidates.
+
+Ephemeral runtime state only (Design Lens #6): losing the cache loses
+nothing but latency.
+
+Multi-worker mode: each worker keeps its own entries, but invalidation
+generations live in a shared directory (FileGenerations), so a write handled
+by one worker drops stale results in all of them.
+"""
+import copy
+import fcntl
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from platform_observability import tracing
+
+
+# ---------------------------------------------------------------------------
+# Invalidation generations
+# ---------------------------------------------------------------------------
+
+class LocalGenerations:
+    """Per-tool invalidation counters for a single process."""
+
+    def __init__(self):
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, tool_name: str) -> int:
+        with self._lock:
+            return self._counters.get(tool_name, 0)
+
+    def bump(self, tool_name: str) -> None:
+        with self._lock:
+            self._counters[tool_name] = self._counters.get(tool_name, 0) + 1
+
+
+class FileGenerations:
+    """
+    Per-tool invalidation counters shared by all workers on this host.
+    One small file per tool; bumps are serialized with flock.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, tool_name: str) -> Path:
+        return self.directory / tool_name
+
+    def get(self, tool_name: str) -> int:
+        try:
+            return int(self._path(tool_name).read_text() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def bump(self, tool_name: str) -> None:
+        fd = os.open(self._path(tool_name), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            current = int(os.read(fd, 32) or 0)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, str(current + 1).encode())
+        finally:
+            os.close(fd)
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+
+class ToolResultCache:
+    """
+    TTL + LRU cache keyed on (tool name, normalized arguments).
+
+    ttl_seconds: how long a result may be served without hitting the tool.
+    max_entries: LRU bound across all tools.
+    generations: invalidation counters; LocalGenerations unless shared.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 60.0,
+        max_entries: int = 256,
+        generations: Optional[LocalGenerations | FileGenerations] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.generations = generations or LocalGenerations()
+        # key -> (expires_at, generation, value)
+        self._entries: OrderedDict[tuple[str, str], tuple[float, int, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # -----------------------------------------------------------------------
+    # Keys
+    # -----------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(name: str, fn: Callable, args: tuple, kwargs: dict) -> tuple[str, str]:
+        """
+        Normalize a call to a stable key.
+
+        Positional and keyword spellings of the same call, and calls that rely
+        on defaults vs. pass them explicitly, map to the same key.
+        """
+        bound = inspect.signature(fn).bind(*args, **kwargs)
+        bound.apply_defaults()
+        normalized = json.dumps(bound.arguments, sort_keys=True, default=str)
+        return name, normalized
+
+    # -----------------------------------------------------------------------
+    # Storage
+    # -----------------------------------------------------------------------
+
+    def get(self, key: tuple[str, str]) -> tuple[bool, Any]:
+        """Return (found, value). Expired or invalidated entries count as misses."""
+        now = time.monotonic()
+        generation = self.generations.get(key[0])
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now or entry[1] != generation:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, copy.deepcopy(entry[2])
+
+    def generation(self, tool_name: str) -> int:
+        """Counter bumped on every invalidation of `tool_name`."""
+        return self.generations.get(tool_name)
+
+    def put(self, key: tuple[str, str], value: Any, generation: int) -> None:
+        """
+        Store a result computed while the tool was at `generation`.
+        If a write invalidated the tool in the meantime the result is dropped.
+        """
+        if self.generations.get(key[0]) != generation:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, generation, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *tool_names: str) -> int:
+        """Drop every cached result of the given tools. Returns entries removed."""
+        names = set(tool_names)
+        for n in names:
+            self.generations.bump(n)
+        with self._lock:
+            stale = [k for k in self._entries if k[0] in names]
+            for k in stale:
+                del self._entries[k]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    # -----------------------------------------------------------------------
+    # Tool wrappers
+    # -----------------------------------------------------------------------
+
+    def read_through(self, fn: Callable) -> Callable:
+        """
+        Wrap a read-only tool (sync or async). Signature and docstring are
+        preserved so the MCP schema generated from the wrapper is identical
+        to the original.
+        """
+        name = fn.__name__
+
+        def lookup(args, kwargs):
+            key = self.make_key(name, fn, args, kwargs)
+            found, value = self.get(key)
+            tracing.annotate(cache="hit" if found else "miss")
+            return key, found, value
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                key, found, value = lookup(args, kwargs)
+                if found:
+                    return value
+                generation = self.generation(name)
+                value = await fn(*args, **kwargs)
+                self.put(key, value, generation)
+                return value
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key, found, value = lookup(args, kwargs)
+            if found:
+                return value
+            generation = self.generation(name)
+            value = fn(*args, **kwargs)
+            self.put(key, value, generation)
+            return value
+
+        return wrapper
+
+    def invalidating(self, fn: Callable, *read_tools: str) -> Callable:
+        """Wrap a write tool (sync or async) so a successful call drops results of `read_tools`."""
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                result = await fn(*args, **kwargs)
+                self.invalidate(*read_tools)
+                return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            result = fn(*args, **kwargs)
+            self.invalidate(*read_tools)
+            return result
+
+        return wrapper
@@ -1,28 +1,189 @@
 import os
+from pathlib import Path
+
+import uvicorn
+from cryptography.fernet import Fernet
 from fastmcp import FastMCP
+from fastmcp.server.auth.jwt_issuer import derive_jwt_key
 from fastmcp.server.auth.providers.google import GoogleProvider
+from key_value.aio.stores.disk import DiskStore
+from key_value.aio.wrappers.encryption import FernetEncryptionWrapper
+from platform_admission.controller import AdmissionController, parse_limits
+from platform_observability import slowquery, tracing
+from platform_scheduler.asgi import SchedulerLifespan
+from platform_scheduler.scheduler import Scheduler
+
+from app.admission import AdmissionMiddleware
+from app.auth_cache import TokenCache
+from app.cache import FileGenerations, ToolResultCache
+from app.registry import ToolRegistry, default_app_root
+from app.tracing import TraceASGIMiddleware, TracingMiddleware
+
+# ---------------------------------------------------------------------------
+# Deployment mode
+# MCP_WORKERS=1 (default): one process, in-memory MCP sessions.
+# MCP_WORKERS>1: stateless HTTP (no MCP session state at all), several
+# uvicorn worker processes. Everything that must be shared between workers
+# lives under MCP_STATE_DIR on the local disk:
+#   oauth/              OAuth proxy clients, transactions and upstream tokens
+#                       (Fernet-encrypted, see oauth_storage)
+#   cache-generations/  result-cache invalidation counters
+# Token/result cache entries stay per worker (ephemeral, Design Lens #6).
+# ---------------------------------------------------------------------------
+WORKERS = int(os.environ.get("MCP_WORKERS", 1))
+STATELESS = WORKERS > 1 or os.environ.get("MCP_STATELESS", "0") == "1"
+STATE_DIR = Path(os.environ["MCP_STATE_DIR"]) if os.environ.get("MCP_STATE_DIR") else None
+
+if WORKERS > 1 and STATE_DIR is None:
+    raise RuntimeError("MCP_WORKERS > 1 requires MCP_STATE_DIR (shared auth + cache state)")
 
 # ---------------------------------------------------------------------------
 # Auth: FastMCP proxies OAuth to Google.
-# ChatGPT authenticates once; token validated on every request.
+# ChatGPT authenticates once; every request carries the token.
+# TokenCache: only the first request per token pays Google's validation
+# round trip; later ones are served locally for a short TTL (auth_cache.py).
 # ---------------------------------------------------------------------------
+def oauth_storage(state_dir: Path, client_secret: str) -> FernetEncryptionWrapper:
+    """
+    Encrypted OAuth store under state_dir/oauth (upstream Google tokens).
+    Key: MCP_STORAGE_ENCRYPTION_KEY if set, otherwise derived from the client
+    secret the same way fastmcp derives its default store key. Entries that
+    no longer decrypt (key rotated) read as missing; clients re-register.
+    """
+    secret = os.environ.get("MCP_STORAGE_ENCRYPTION_KEY")
+    if secret:
+        key = derive_jwt_key(high_entropy_material=secret, salt="atlas-mcp-storage-encryption-key")
+    else:
+        signing_key = derive_jwt_key(high_entropy_material=client_secret, salt="fastmcp-jwt-signing-key")
+        key = derive_jwt_key(high_entropy_material=signing_key.decode(), salt="fastmcp-storage-encryption-key")
+    return FernetEncryptionWrapper(
+        key_value=DiskStore(directory=state_dir / "oauth"),
+        fernet=Fernet(key),
+        raise_on_decryption_error=False,
+    )
+
+
 auth = GoogleProvider(
     client_id=os.environ["GOOGLE_CLIENT_ID"],
     client_secret=os.environ["GOOGLE_CLIENT_SECRET"],
     base_url=os.environ["MCP_BASE_URL"],  # https://mcp.linspad.net
+    client_storage=oauth_storage(STATE_DIR, os.environ["GOOGLE_CLIENT_SECRET"]) if STATE_DIR else None,
+)
+token_cache = TokenCache(
+    max_entries=int(os.environ.get("MCP_TOKEN_CACHE_MAX_ENTRIES", 1024)),
+    max_ttl_seconds=float(os.environ.get("MCP_TOKEN_CACHE_MAX_TTL_SEC", 60)),
+    negative_ttl_seconds=float(os.environ.get("MCP_TOKEN_CACHE_NEGATIVE_TTL_SEC", 30)),
 )
+token_cache.install(auth)
 
 mcp = FastMCP("Atlas MCP Gateway", auth=auth)
+mcp.add_middleware(TracingMiddleware())
+# Slow tool SQL -> platform.slow_query_log, tagged with the trace id
+slowquery.configure(app="mcpgateway")
+
+# ---------------------------------------------------------------------------
+# Result cache: read-only tools are served from memory until their TTL runs
+# out or a write tool invalidates them.
+# ---------------------------------------------------------------------------
+cache = ToolResultCache(
+    ttl_seconds=float(os.environ.get("MCP_CACHE_TTL_SEC", 60)),
+    max_entries=int(os.environ.get("MCP_CACHE_MAX_ENTRIES", 256)),
+    generations=FileGenerations(STATE_DIR / "cache-generations") if STATE_DIR else None,
+)
+READ_ONLY = {"readOnlyHint": True}
 
 # ---------------------------------------------------------------------------
 # Register domain tools from applications.
-# Each application exposes plain functions; the gateway owns the MCP protocol.
-# Add new application tool modules here as Atlas grows.
+# Each application exposes plain functions plus an mcp_manifest.json; the
+# gateway owns the MCP protocol. Manifests are discovered under
+# ATLAS_APP_ROOT and tool modules are imported on first call, so startup
+# cost does not grow with the number of applications.
+# Manifest flags: "read_only" -> cache.read_through + readOnlyHint,
+# "invalidates" -> cache.invalidating(fn, <read tools it changes>).
+# ---------------------------------------------------------------------------
+registry = ToolRegistry(mcp, cache)
+registry.register_all(default_app_root())
+
+# ---------------------------------------------------------------------------
+# Background jobs declared in the manifests ("jobs"), run by
+# platform_scheduler while the server is up. Every worker runs a scheduler;
+# the Postgres lease (platform.job_lease) lets one of them take each run.
+# History: platform.job_run / gateway_scheduler_status.
+# ---------------------------------------------------------------------------
+scheduler = Scheduler(app="mcpgateway")
+registry.register_jobs(scheduler)
+
+# ---------------------------------------------------------------------------
+# Admission control: bounded global + per-tool concurrency in front of the
+# tools, so a burst of calls cannot open one Postgres connection each.
+# Calls beyond the limits wait up to MCP_ADMISSION_MAX_WAIT_SEC in a queue of
+# MCP_ADMISSION_MAX_QUEUE; the rest are shed with a retry hint.
+# Per-tool limits: manifest "max_concurrency", overridden by
+# MCP_ADMISSION_TOOL_LIMITS ("tool=n,tool=n"). Limits are per worker.
 # ---------------------------------------------------------------------------
-from foodtracker.tools import log_meal, get_nutrition_summary  # noqa: E402
+admission = AdmissionController(
+    max_concurrency=int(os.environ.get("MCP_ADMISSION_MAX_CONCURRENCY", 8)),
+    max_queue=int(os.environ.get("MCP_ADMISSION_MAX_QUEUE", 32)),
+    max_wait_seconds=float(os.environ.get("MCP_ADMISSION_MAX_WAIT_SEC", 2)),
+    per_key_limit=int(os.environ.get("MCP_ADMISSION_PER_TOOL", 4)),
+    key_limits={**registry.concurrency_limits, **parse_limits(os.environ.get("MCP_ADMISSION_TOOL_LIMITS"))},
+)
+mcp.add_middleware(AdmissionMiddleware(admission))
+
+
+@mcp.tool(annotations=READ_ONLY)
+def gateway_cache_stats() -> dict:
+    """Hit/miss counters and size of the gateway result and token caches; slow-query capture counters."""
+    return {"results": cache.stats(), "tokens": token_cache.stats(), "slow_queries": slowquery.recorder.stats()}
+
+
+@mcp.tool(annotations=READ_ONLY)
+def gateway_registry_status() -> list[dict]:
+    """Registered application tool modules: tools, imported yet, import time."""
+    return registry.status()
+
+
+@mcp.tool(annotations=READ_ONLY)
+def gateway_admission_stats() -> dict:
+    """
+    Admission control of this worker: slots in flight, queue depth, wait-time
+    percentiles, and admitted/queued/rejected counts per tool.
+    """
+    return admission.stats()
+
+
+@mcp.tool(annotations=READ_ONLY)
+def gateway_scheduler_status(limit: int = 20) -> dict:
+    """Scheduled jobs of this worker (next due, last result) and the latest runs of all workers."""
+    return {**scheduler.status(), "recent_runs": scheduler.history(limit=limit)}
+
+
+@mcp.tool(annotations=READ_ONLY)
+def gateway_traces(limit: int = 20, contains: str | None = None, min_ms: float = 0.0) -> list[dict]:
+    """
+    Recent request traces of this worker, newest first.
+
+    contains: filter on request name, MCP method or tool name (substring).
+    min_ms: only traces at least this slow.
+    Each trace is a span tree: auth, dispatch, import, tool, sql (statement,
+    rows, duration_ms).
+    """
+    return tracing.buffer.recent(limit=limit, name_contains=contains, min_ms=min_ms)
+
+
+@mcp.tool(annotations=READ_ONLY)
+def gateway_trace(trace_id: str) -> dict | None:
+    """One trace by id (from the x-atlas-trace-id header or result _meta)."""
+    return tracing.buffer.get(trace_id)
+
 
-mcp.tool(log_meal)
-mcp.tool(get_nutrition_summary)
+# ASGI app for uvicorn workers: uvicorn app.main:http_app --workers N
+# TraceASGIMiddleware is outermost so the root span also covers auth;
+# SchedulerLifespan starts/stops the scheduler with the server.
+http_app = TraceASGIMiddleware(SchedulerLifespan(mcp.http_app(stateless_http=STATELESS), scheduler))
 
 if __name__ == "__main__":
-    mcp.run(transport="http", host="0.0.0.0", port=8002)
+    if WORKERS > 1:
+        uvicorn.run("app.main:http_app", host="0.0.0.0", port=8002, workers=WORKERS)
+    else:
+        uvicorn.run(http_app, host="0.0.0.0", port=8002)
@@ -0,0 +1,300 @@
+"""
+Application tool registry — manifest discovery + lazy import.
+
+Each application that exposes MCP tools ships an `mcp_manifest.json` next to
+its tool module:
+
+    {
+      "application": "FoodTracker",
+      "module": "foodtracker.tools",
+      "tools": [
+        {
+          "name": "get_nutrition_summary",
+          "description": "...",
+          "read_only": true,
+          "invalidates": [],
+          "invalidated_by": ["log_meal"],
+          "max_concurrency": 2,
+          "parameters": {...JSON schema...},
+          "output_schema": {...JSON schema or null...}
+        }
+      ]
+    }
+
+At startup the gateway registers every tool from the manifests *without*
+importing the application module. The module is imported on the first call
+of any of its tools; the import time is recorded per module.
+
+"invalidates" (on a write tool) and "invalidated_by" (on a read tool) both
+declare which cached read results a write drops; "invalidated_by" lets an
+application depend on another application's write tools without editing
+that application's manifest.
+
+"max_concurrency" (optional) caps concurrent calls of one tool at the
+gateway's admission control; collected in ToolRegistry.concurrency_limits.
+
+"jobs" (optional) lists background jobs for platform_scheduler; the
+module ("module", default: the tool module) is imported on the first run:
+
+    "jobs": [
+      {"name": "foodtracker.analyze", "module": "foodtracker.jobs",
+       "function": "analyze_food_logs", "every_seconds": 900}
+    ]
+
+Schedule: "cron" ("30 3 * * *") or "every_seconds"; optional
+"max_runtime_seconds" (lease length, default 600).
+
+The manifest is the tool contract. Regenerate the schema fields from code
+after changing a tool signature:
+
+    python -m app.registry path/to/mcp_manifest.json
+"""
+import functools
+import importlib
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+from fastmcp import FastMCP
+from fastmcp.tools import FunctionTool, Tool, ToolResult
+from mcp.types import ToolAnnotations
+from platform_observability import tracing
+from pydantic import PrivateAttr
+
+from app.cache import ToolResultCache
+
+log = logging.getLogger("atlas.mcpgateway")
+
+MANIFEST_NAME = "mcp_manifest.json"
+
+
+# ---------------------------------------------------------------------------
+# Lazy module
+# ---------------------------------------------------------------------------
+
+class LazyModule:
+    """An application tool module that is imported on first use."""
+
+    def __init__(self, application: str, module_name: str, manifest_path: Path):
+        self.application = application
+        self.module_name = module_name
+        self.manifest_path = manifest_path
+        self.tool_names: list[str] = []
+        self.import_seconds: Optional[float] = None
+        self.import_error: Optional[str] = None
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._module is not None:
+            return self._module
+        with self._lock:
+            if self._module is None:
+                start = time.perf_counter()
+                try:
+                    with tracing.span("import", module=self.module_name):
+                        self._module = importlib.import_module(self.module_name)
+                except Exception as e:
+                    self.import_error = f"{type(e).__name__}: {e}"
+                    raise
+                self.import_seconds = time.perf_counter() - start
+                self.import_error = None
+                log.info("Imported %s in %.1f ms", self.module_name, self.import_seconds * 1000)
+        return self._module
+
+    def status(self) -> dict:
+        return {
+            "application": self.application,
+            "module": self.module_name,
+            "imported": self._module is not None,
+            "import_ms": round(self.import_seconds * 1000, 1) if self.import_seconds is not None else None,
+            "import_error": self.import_error,
+            "tools": self.tool_names,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Lazy tool
+# ---------------------------------------------------------------------------
+
+class LazyTool(Tool):
+    """
+    MCP tool whose schema comes from the manifest and whose implementation
+    is resolved on first call. The resolved function is wrapped with the
+    gateway result cache according to the manifest flags.
+    """
+
+    _target: LazyModule = PrivateAttr()
+    _cache: ToolResultCache = PrivateAttr()
+    _read_only: bool = PrivateAttr(default=False)
+    _invalidations: dict[str, set[str]] = PrivateAttr(default_factory=dict)
+    _function_tool: Optional[FunctionTool] = PrivateAttr(default=None)
+
+    @classmethod
+    def from_manifest(
+        cls,
+        entry: dict,
+        target: LazyModule,
+        cache: ToolResultCache,
+        invalidations: dict[str, set[str]],
+    ) -> "LazyTool":
+        read_only = bool(entry.get("read_only", False))
+        tool = cls(
+            name=entry["name"],
+            description=entry.get("description"),
+            parameters=entry["parameters"],
+            output_schema=entry.get("output_schema"),
+            annotations=ToolAnnotations(readOnlyHint=True) if read_only else None,
+        )
+        tool._target = target
+        tool._cache = cache
+        tool._read_only = read_only
+        tool._invalidations = invalidations
+        return tool
+
+    def _resolve(self) -> FunctionTool:
+        if self._function_tool is None:
+            fn = getattr(self._target.load(), self.name)
+            if self._read_only:
+                fn = self._cache.read_through(fn)
+            # Looked up at first call: manifests registered later may add to it
+            invalidates = self._invalidations.get(self.name)
+            if invalidates:
+                fn = self._cache.invalidating(fn, *sorted(invalidates))
+            fn = _traced(fn, self.name)
+            self._function_tool = FunctionTool.from_function(fn, name=self.name)
+        return self._function_tool
+
+    async def run(self, arguments: dict[str, Any]) -> ToolResult:
+        return await self._resolve().run(arguments)
+
+
+def _traced(fn, tool_name: str):
+    """Wrap a tool function in a "tool" span (sync functions run in a worker thread)."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            with tracing.span("tool", tool=tool_name):
+                return await fn(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with tracing.span("tool", tool=tool_name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def _lazy_job(module: LazyModule, function_name: str):
+    def run():
+        return getattr(module.load(), function_name)()
+    run.__name__ = function_name
+    return run
+
+
+# ---------------------------------------------------------------------------
+# Discovery + registration
+# ---------------------------------------------------------------------------
+
+def discover_manifests(root: Path) -> list[Path]:
+    """Every `<root>/<application>/mcp_manifest.json`, sorted for stable order."""
+    return sorted(root.glob(f"*/{MANIFEST_NAME}"))
+
+
+class ToolRegistry:
+    def __init__(self, mcp: FastMCP, cache: ToolResultCache):
+        self.mcp = mcp
+        self.cache = cache
+        self.modules: list[LazyModule] = []
+        # write tool name -> read tool names whose cached results it drops
+        self.invalidations: dict[str, set[str]] = {}
+        # tool name -> manifest "max_concurrency"
+        self.concurrency_limits: dict[str, int] = {}
+        # manifest "jobs" entries with the module that holds the function
+        self.jobs: list[tuple[dict, LazyModule]] = []
+
+    def register_manifest(self, path: Path) -> LazyModule:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+        target = LazyModule(manifest["application"], manifest["module"], path)
+        for entry in manifest["tools"]:
+            for write_tool in entry.get("invalidated_by", ()):
+                self.invalidations.setdefault(write_tool, set()).add(entry["name"])
+            if entry.get("invalidates"):
+                self.invalidations.setdefault(entry["name"], set()).update(entry["invalidates"])
+            if entry.get("max_concurrency"):
+                self.concurrency_limits[entry["name"]] = int(entry["max_concurrency"])
+            self.mcp.add_tool(LazyTool.from_manifest(entry, target, self.cache, self.invalidations))
+            target.tool_names.append(entry["name"])
+        self.modules.append(target)
+        for entry in manifest.get("jobs", ()):
+            self.jobs.append((entry, self._job_module(manifest, entry, target, path)))
+        log.info("Registered %d tools from %s (lazy)", len(target.tool_names), path)
+        return target
+
+    def _job_module(self, manifest: dict, entry: dict, tools: LazyModule, path: Path) -> LazyModule:
+        module_name = entry.get("module", manifest["module"])
+        for module in self.modules:
+            if module.module_name == module_name:
+                return module
+        module = LazyModule(manifest["application"], module_name, path)
+        self.modules.append(module)
+        return module
+
+    def register_jobs(self, scheduler) -> None:
+        """Add every manifest job to a platform_scheduler.Scheduler."""
+        for entry, module in self.jobs:
+            scheduler.add_job(
+                entry["name"],
+                _lazy_job(module, entry["function"]),
+                cron=entry.get("cron"),
+                every=entry.get("every_seconds"),
+                max_runtime=timedelta(seconds=entry.get("max_runtime_seconds", 600)),
+            )
+
+    def register_all(self, root: Path) -> None:
+        for path in discover_manifests(root):
+            self.register_manifest(path)
+
+    def status(self) -> list[dict]:
+        return [m.status() for m in self.modules]
+
+
+def default_app_root() -> Path:
+    """Directory holding the application packages (ATLAS_APP_ROOT, else the gateway root)."""
+    return Path(os.environ.get("ATLAS_APP_ROOT", Path(__file__).resolve().parents[1]))
+
+
+# ---------------------------------------------------------------------------
+# Manifest regeneration (dev-time; imports the module)
+# ---------------------------------------------------------------------------
+
+def manifest_from_code(manifest: dict) -> dict:
+    """Copy of the manifest with description/parameters/output_schema taken from code."""
+    manifest = json.loads(json.dumps(manifest))
+    module = importlib.import_module(manifest["module"])
+    for entry in manifest["tools"]:
+        fn_tool = FunctionTool.from_function(getattr(module, entry["name"]))
+        entry["description"] = fn_tool.description
+        entry["parameters"] = fn_tool.parameters
+        entry["output_schema"] = fn_tool.output_schema
+    return manifest
+
+
+def refresh_manifest(path: Path) -> dict:
+    """Rewrite description/parameters/output_schema of each listed tool from code."""
+    manifest = manifest_from_code(json.loads(path.read_text(encoding="utf-8")))
+    path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return manifest
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:]:
+        refresh_manifest(Path(arg))
+        print(f"Refreshed {arg}")
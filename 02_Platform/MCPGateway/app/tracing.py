@@ -0,0 +1,87 @@
+"""
+Gateway tracing: one trace per HTTP request, spans for auth, MCP dispatch,
+tool execution and SQL (see platform_observability.tracing).
+
+    POST /mcp                      TraceASGIMiddleware (root, outermost)
+      auth                         TokenCache-wrapped verify_token
+      dispatch tools/call          TracingMiddleware (FastMCP middleware)
+        import                     first call only (registry.LazyModule)
+        tool                       registry.LazyTool -> application function
+          sql                      platform_observability.pg cursors
+
+The trace id is returned as the `x-atlas-trace-id` response header and in
+the tool result `_meta` (`atlas_trace_id`). Query with the gateway_traces /
+gateway_trace tools.
+"""
+from typing import Any
+
+from fastmcp.server.dependencies import get_http_request
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from platform_observability import tracing
+
+TRACE_HEADER = b"x-atlas-trace-id"
+SCOPE_KEY = "atlas_trace"
+
+
+class TraceASGIMiddleware:
+    """
+    Pure ASGI wrapper around the whole gateway app, so the root span also
+    covers FastMCP's auth middleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with tracing.trace(f"{scope['method']} {scope['path']}") as root:
+            # Stateful MCP sessions dispatch in a long-lived task that does not
+            # inherit our ContextVar; they find the root via the request state.
+            scope.setdefault("state", {})[SCOPE_KEY] = root
+
+            async def send_with_trace_id(message):
+                if message["type"] == "http.response.start":
+                    root.attrs["status"] = message["status"]
+                    headers = list(message.get("headers", []))
+                    headers.append((TRACE_HEADER, root.trace_id.encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace_id)
+
+
+def _root(span):
+    while span.parent is not None:
+        span = span.parent
+    return span
+
+
+def _request_root():
+    try:
+        return get_http_request().scope.get("state", {}).get(SCOPE_KEY)
+    except RuntimeError:
+        return None  # not an HTTP request (e.g. in-memory client)
+
+
+class TracingMiddleware(Middleware):
+    """Dispatch span per MCP request; tool name + trace id on tool calls."""
+
+    async def on_request(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        parent = _request_root() or tracing.current_span()
+        if parent is None:
+            return await call_next(context)
+        _root(parent).attrs["mcp_method"] = context.method
+        with tracing.use_span(parent), tracing.span(f"dispatch {context.method}"):
+            return await call_next(context)
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        current = tracing.current_span()
+        if current is not None:
+            _root(current).attrs["tool"] = context.message.name
+        result = await call_next(context)
+        trace_id = tracing.current_trace_id()
+        if trace_id is not None:
+            result.meta = {**(result.meta or {}), "atlas_trace_id": trace_id}
+        return result
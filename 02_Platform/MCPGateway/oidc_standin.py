@@ -0,0 +1,68 @@
+"""
+Local stand-in for an OIDC issuer — serves a JWKS and mints signed tokens.
+Use this to exercise the gateway's token validation + TokenCache offline.
+
+Run:   python oidc_standin.py [--ttl 3600]
+Then:  set the printed MCP_LOCAL_* env vars, start run_local.py, run test_local.py.
+Requires: pip install fastmcp
+"""
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from authlib.jose import JsonWebKey
+from fastmcp.server.auth.providers.jwt import RSAKeyPair
+
+HOST, PORT = "127.0.0.1", 8003
+ISSUER = f"http://{HOST}:{PORT}"
+AUDIENCE = "atlas-mcp-local"
+KID = "atlas-local-1"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ttl", type=int, default=3600, help="token lifetime in seconds")
+    args = parser.parse_args()
+
+    key_pair = RSAKeyPair.generate()
+    jwk = JsonWebKey.import_key(key_pair.public_key, {"kty": "RSA", "use": "sig", "kid": KID})
+    documents = {
+        "/.well-known/openid-configuration": {
+            "issuer": ISSUER,
+            "jwks_uri": f"{ISSUER}/.well-known/jwks.json",
+        },
+        "/.well-known/jwks.json": {"keys": [jwk.as_dict()]},
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            doc = documents.get(self.path)
+            if doc is None:
+                self.send_error(404)
+                return
+            body = json.dumps(doc).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    token = key_pair.create_token(
+        subject="atlas-local-user",
+        issuer=ISSUER,
+        audience=AUDIENCE,
+        expires_in_seconds=args.ttl,
+        kid=KID,
+    )
+
+    print(f"Stand-in OIDC issuer on {ISSUER}")
+    print()
+    print(f"MCP_LOCAL_JWKS_URI={ISSUER}/.well-known/jwks.json")
+    print(f"MCP_LOCAL_ISSUER={ISSUER}")
+    print(f"MCP_LOCAL_AUDIENCE={AUDIENCE}")
+    print(f"MCP_LOCAL_TOKEN={token}")
+    ThreadingHTTPServer((HOST, PORT), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,55 @@ Use this to test tool logic before deploying to the Pi.
 
 Run:  python run_local.py
 Test: python -c "import httpx; print(httpx.post('http://localhost:8002/mcp', ...))"
+
+Auth mode: with MCP_LOCAL_JWKS_URI / MCP_LOCAL_ISSUER / MCP_LOCAL_AUDIENCE set
+(see oidc_standin.py) tokens are validated against the stand-in issuer
+through the same TokenCache the gateway uses.
+
+App tools: with ATLAS_APP_ROOT pointing at a directory that contains the
+application packages under their import names (e.g. a `foodtracker` link to
+03_Application/FoodTracker) and ATLAS_PG_* set, the manifest tools are
+registered too — same registry and result cache as the gateway.
 """
 import sys
 import os
+from pathlib import Path
 
-# Point Python at the app package
+# Point Python at the app package + platform packages
 sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "04_Observability", "packages"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "05_Admission", "packages"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "06_Scheduler", "packages"))
 
+import uvicorn
 from fastmcp import FastMCP
+from fastmcp.server.auth.providers.jwt import JWTVerifier
+from platform_admission.controller import AdmissionController
+from platform_observability import tracing
+from platform_scheduler.asgi import SchedulerLifespan
+from platform_scheduler.scheduler import Scheduler
+
+from app.admission import AdmissionMiddleware
+from app.auth_cache import TokenCache
+from app.cache import ToolResultCache
+from app.registry import ToolRegistry
+from app.tracing import TraceASGIMiddleware, TracingMiddleware
 
-mcp = FastMCP("Atlas Food MCP (local/no-auth)")
+auth = None
+token_cache = TokenCache()
+if os.environ.get("MCP_LOCAL_JWKS_URI"):
+    auth = JWTVerifier(
+        jwks_uri=os.environ["MCP_LOCAL_JWKS_URI"],
+        issuer=os.environ["MCP_LOCAL_ISSUER"],
+        audience=os.environ["MCP_LOCAL_AUDIENCE"],
+    )
+    token_cache.install(auth)
+
+mcp = FastMCP(
+    "Atlas Food MCP (local/jwt)" if auth else "Atlas Food MCP (local/no-auth)",
+    auth=auth,
+)
+mcp.add_middleware(TracingMiddleware())
 
 FRUIT_COLORS: dict[str, str] = {
     "apple": "red",
@@ -34,7 +73,53 @@ def get_fruit_color(fruit: str) -> str:
         return f"Unknown fruit '{fruit}'. Known fruits: {known}."
     return color
 
+cache = ToolResultCache()
+registry = ToolRegistry(mcp, cache)
+if os.environ.get("ATLAS_APP_ROOT"):
+    sys.path.insert(0, os.environ["ATLAS_APP_ROOT"])
+    registry.register_all(Path(os.environ["ATLAS_APP_ROOT"]))
+
+# Manifest jobs run only with ATLAS_APP_ROOT (they need Postgres)
+scheduler = Scheduler(app="mcpgateway-local")
+registry.register_jobs(scheduler)
+
+admission = AdmissionController(
+    max_concurrency=int(os.environ.get("MCP_ADMISSION_MAX_CONCURRENCY", 8)),
+    max_queue=int(os.environ.get("MCP_ADMISSION_MAX_QUEUE", 32)),
+    per_key_limit=4,
+    key_limits=registry.concurrency_limits,
+)
+mcp.add_middleware(AdmissionMiddleware(admission))
+
+@mcp.tool
+def gateway_cache_stats() -> dict:
+    """Hit/miss counters of the result and token caches."""
+    return {"results": cache.stats(), "tokens": token_cache.stats()}
+
+@mcp.tool
+def gateway_registry_status() -> list[dict]:
+    """Registered application tool modules: tools, imported yet, import time."""
+    return registry.status()
+
+@mcp.tool
+def gateway_admission_stats() -> dict:
+    """Admission control: in flight, queue depth, wait times, rejections per tool."""
+    return admission.stats()
+
+@mcp.tool
+def gateway_scheduler_status() -> dict:
+    """Scheduled jobs: next due, last status and duration."""
+    return scheduler.status()
+
+@mcp.tool
+def gateway_traces(limit: int = 20, contains: str | None = None, min_ms: float = 0.0) -> list[dict]:
+    """Recent request traces, newest first."""
+    return tracing.buffer.recent(limit=limit, name_contains=contains, min_ms=min_ms)
+
 if __name__ == "__main__":
-    print("Starting MCP server locally on http://localhost:8002 (no auth)")
+    print(f"Starting MCP server locally on http://localhost:8002 ({'jwt' if auth else 'no'} auth)")
     print("MCP endpoint: http://localhost:8002/mcp")
-    mcp.run(transport="http", host="127.0.0.1", port=8002)
+    app = mcp.http_app()
+    if os.environ.get("ATLAS_APP_ROOT"):
+        app = SchedulerLifespan(app, scheduler)
+    uvicorn.run(TraceASGIMiddleware(app), host="127.0.0.1", port=8002)
@@ -1,27 +1,67 @@
 """
-Quick smoke test for the local MCP server.
-Run:  python test_local.py
+Smoke test + load benchmark for the local MCP server.
+
+Smoke: python test_local.py
+Load:  python test_local.py load --sessions 8 --calls 50 [--rng-seed 1] [--writes]
+                                [--seed-meals 200] [--out bench.jsonl]
 Requires: pip install httpx fastmcp
+
+Auth mode: set MCP_LOCAL_TOKEN (printed by oidc_standin.py) to send it as a
+bearer token on every request.
+
+Load mode runs N concurrent MCP sessions over one pooled async client. Each
+session does initialize + tools/list, then a random mix of the tool calls
+the server offers (get_fruit_color, and the FoodTracker tools when
+run_local.py was started with ATLAS_APP_ROOT + a local Postgres). The mix
+and the arguments come from random.Random(--rng-seed, default 1) per
+session, so the same seed replays the same calls (same cache hits and
+misses) on every commit. Only read tools are called unless --writes adds
+log_meal, which inserts rows into food_logs. --seed-meals logs synthetic
+meals first so the summaries have data to aggregate.
+Results (p50/p99 latency of successful calls, error counts, throughput per
+operation) are printed and, with --out, appended as one JSON line tagged
+with the git commit, so runs can be compared across commits.
 """
-import httpx, json
+import argparse
+import asyncio
+import httpx, json, os
+import random
+import subprocess
+import time
+from datetime import date, datetime, timedelta
 
 BASE = "http://localhost:8002/mcp"
+TOKEN = os.environ.get("MCP_LOCAL_TOKEN")
 
-def mcp_call(payload, session_id=None):
+# One pooled client for the whole smoke run (keep-alive, no per-call handshake)
+CLIENT = httpx.Client(timeout=10)
+
+
+def _headers(session_id=None):
     headers = {
         "Content-Type": "application/json",
         "Accept": "application/json, text/event-stream",
     }
     if session_id:
         headers["mcp-session-id"] = session_id
-    r = httpx.post(BASE, json=payload, headers=headers, timeout=10)
+    if TOKEN:
+        headers["Authorization"] = f"Bearer {TOKEN}"
+    return headers
+
+
+def _parse(r, session_id):
     sid = r.headers.get("mcp-session-id", session_id)
     # Response may be SSE (data: {...}) or plain JSON
     text = r.text.strip()
     for line in text.splitlines():
         if line.startswith("data:"):
             return json.loads(line[5:].strip()), sid
-    return r.json(), sid
+    return (r.json() if text else {}), sid
+
+
+def mcp_call(payload, session_id=None):
+    r = CLIENT.post(BASE, json=payload, headers=_headers(session_id))
+    return _parse(r, session_id)
 
 
 def call_tool(name, args, session_id):
@@ -87,11 +127,213 @@ def run():
             if not passed:
                 all_passed = False
 
+    if TOKEN:
+        print()
+        print(f"   Caches: {call_tool('gateway_cache_stats', {}, sid)}")
+
     print()
     print("=" * 50)
     print("ALL TESTS PASSED ✅" if all_passed else "SOME TESTS FAILED ❌")
     print("=" * 50)
 
 
+# ---------------------------------------------------------------------------
+# Load benchmark
+# ---------------------------------------------------------------------------
+
+INIT_PARAMS = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {},
+    "clientInfo": {"name": "load-test", "version": "1.0"},
+}
+
+
+async def amcp_call(client, payload, session_id=None):
+    r = await client.post(BASE, json=payload, headers=_headers(session_id))
+    r.raise_for_status()
+    result, sid = _parse(r, session_id)
+    if "error" in result or result.get("result", {}).get("isError"):
+        raise RuntimeError(str(result)[:200])
+    return result, sid
+
+
+def _random_range(rng):
+    # A handful of recurring ranges, like an assistant re-asking about "this week"
+    end = date.today() - timedelta(days=rng.choice([0, 0, 0, 7, 14]))
+    start = end - timedelta(days=rng.choice([6, 6, 13, 29]))
+    return {"from_date": start.isoformat(), "to_date": end.isoformat()}
+
+
+def _random_meal(rng, days_back=30):
+    logged_at = datetime.now() - timedelta(days=rng.uniform(0, days_back))
+    return {
+        "dish_name": rng.choice(["oats", "pasta", "salad", "chili", "curry"]),
+        "meal_type": rng.choice(["breakfast", "lunch", "dinner", "snack"]),
+        "kcal": rng.randint(150, 900),
+        "protein_g": rng.randint(5, 60),
+        "carbs_g": rng.randint(10, 120),
+        "fat_g": rng.randint(2, 40),
+        "notes": "load-test",
+        "logged_at": logged_at.replace(microsecond=0).isoformat(),
+    }
+
+
+# Operation name -> (weight, argument factory(rng)); filtered to what the server offers
+TOOL_MIX = {
+    "get_fruit_color": (2, lambda rng: {"fruit": rng.choice(["apple", "banana", "mango"])}),
+    "get_nutrition_summary": (6, _random_range),
+    "get_daily_overview": (3, _random_range),
+}
+# Only with --writes: each call inserts a row into the real food_logs
+WRITE_MIX = {
+    "log_meal": (1, _random_meal),
+}
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    async def timed(self, op, coro):
+        """Latency of successful calls only: errors fail fast and would skew p50/p99 down."""
+        start = time.perf_counter()
+        try:
+            result = await coro
+        except Exception:
+            self.errors[op] = self.errors.get(op, 0) + 1
+            return None, None
+        self.samples.setdefault(op, []).append((time.perf_counter() - start) * 1000)
+        return result
+
+
+def _percentile(sorted_ms, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_ms:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_ms))))
+    return round(sorted_ms[rank - 1], 2)
+
+
+async def _session(client, rec, calls, mix, rng):
+    init, sid = await rec.timed("initialize", amcp_call(
+        client, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": INIT_PARAMS}))
+    if init is None:
+        return
+    await client.post(
+        BASE, json={"jsonrpc": "2.0", "method": "notifications/initialized"}, headers=_headers(sid))
+    await rec.timed("tools/list", amcp_call(
+        client, {"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}}, sid))
+
+    names = list(mix)
+    weights = [mix[n][0] for n in names]
+    for i in range(calls):
+        name = rng.choices(names, weights)[0]
+        payload = {"jsonrpc": "2.0", "id": 100 + i, "method": "tools/call",
+                   "params": {"name": name, "arguments": mix[name][1](rng)}}
+        await rec.timed(name, amcp_call(client, payload, sid))
+
+
+def _git_commit():
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+        dirty = subprocess.run(["git", "diff", "--quiet"]).returncode != 0
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def load(sessions, calls, seed_meals, out, rng_seed=1, writes=False):
+    limits = httpx.Limits(max_connections=sessions, max_keepalive_connections=sessions)
+    async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+        # Discover what the server offers
+        _, sid = await amcp_call(
+            client, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": INIT_PARAMS})
+        tools_res, _ = await amcp_call(
+            client, {"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}}, sid)
+        offered = {t["name"] for t in tools_res.get("result", {}).get("tools", [])}
+        candidates = {**TOOL_MIX, **(WRITE_MIX if writes else {})}
+        mix = {name: spec for name, spec in candidates.items() if name in offered}
+        if not mix:
+            raise SystemExit(f"No benchmarkable tools offered (got {sorted(offered)})")
+
+        if seed_meals and "log_meal" in offered:
+            print(f"Seeding {seed_meals} meals via log_meal ...")
+            seed_rng = random.Random(rng_seed)
+            for i in range(seed_meals):
+                await amcp_call(client, {"jsonrpc": "2.0", "id": 10 + i, "method": "tools/call",
+                                         "params": {"name": "log_meal",
+                                                    "arguments": _random_meal(seed_rng)}}, sid)
+
+        rec = Recorder()
+        start = time.perf_counter()
+        # One generator per session: the call sequence does not depend on scheduling
+        await asyncio.gather(*[
+            _session(client, rec, calls, mix, random.Random(rng_seed * 1000 + i))
+            for i in range(sessions)
+        ])
+        elapsed = time.perf_counter() - start
+
+    ops = {}
+    for op in sorted(set(rec.samples) | set(rec.errors)):
+        ordered = sorted(rec.samples.get(op, []))
+        ops[op] = {
+            "count": len(ordered),
+            "errors": rec.errors.get(op, 0),
+            "p50_ms": _percentile(ordered, 50),
+            "p99_ms": _percentile(ordered, 99),
+            "mean_ms": round(sum(ordered) / len(ordered), 2) if ordered else None,
+            "per_sec": round(len(ordered) / elapsed, 1),
+        }
+    total = sum(o["count"] + o["errors"] for o in ops.values())
+    record = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "target": BASE,
+        "auth": bool(TOKEN),
+        "sessions": sessions,
+        "calls_per_session": calls,
+        "rng_seed": rng_seed,
+        "writes": writes,
+        "elapsed_s": round(elapsed, 2),
+        "requests_per_sec": round(total / elapsed, 1),
+        "ops": ops,
+    }
+
+    print("=" * 72)
+    print(f"Load test │ {sessions} sessions × {calls} calls │ rng seed {rng_seed}"
+          f"{' + writes' if writes else ''} │ commit {record['commit']}")
+    print("=" * 72)
+    print(f"{'operation':<24}{'count':>7}{'err':>5}{'p50 ms':>9}{'p99 ms':>9}{'mean ms':>9}{'/s':>8}")
+    for op, o in ops.items():
+        print(f"{op:<24}{o['count']:>7}{o['errors']:>5}{str(o['p50_ms']):>9}{str(o['p99_ms']):>9}"
+              f"{str(o['mean_ms']):>9}{o['per_sec']:>8}")
+    print("-" * 72)
+    print(f"Total: {total} requests in {record['elapsed_s']} s → {record['requests_per_sec']} req/s")
+
+    if out:
+        with open(out, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"Appended result to {out}")
+
+
 if __name__ == "__main__":
-    run()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="mode")
+    lp = sub.add_parser("load", help="concurrent load benchmark")
+    lp.add_argument("--sessions", type=int, default=8, help="concurrent MCP sessions")
+    lp.add_argument("--calls", type=int, default=50, help="tool calls per session")
+    lp.add_argument("--rng-seed", type=int, default=1,
+                    help="seed of the call mix and arguments (same seed = same calls)")
+    lp.add_argument("--writes", action="store_true",
+                    help="include log_meal in the mix (inserts rows into food_logs)")
+    lp.add_argument("--seed-meals", type=int, default=0,
+                    help="meals to log via log_meal before measuring (writes food_logs)")
+    lp.add_argument("--out", help="append the JSON result line to this file")
+    args = parser.parse_args()
+
+    if args.mode == "load":
+        asyncio.run(load(args.sessions, args.calls, args.seed_meals, args.out,
+                         rng_seed=args.rng_seed, writes=args.writes))
+    else:
+        run()
@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+GATEWAY = Path(__file__).resolve().parents[1]
+PLATFORM = GATEWAY.parent
+sys.path[:0] = [str(GATEWAY)] + [
+    str(PLATFORM / package / "packages")
+    for package in ("04_Observability", "05_Admission", "06_Scheduler")
+]
@@ -0,0 +1,80 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.auth_cache import TokenCache
+
+
+def _access_token(token):
+    return SimpleNamespace(token=token, expires_at=time.time() + 3600)
+
+
+def test_cancelled_owner_does_not_fail_waiters():
+    async def scenario():
+        cache = TokenCache()
+        release = asyncio.Event()
+        calls = []
+
+        async def verify_fn(token):
+            calls.append(token)
+            await release.wait()
+            return _access_token(token)
+
+        owner = asyncio.create_task(cache.verify("t", verify_fn))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.verify("t", verify_fn))
+        await asyncio.sleep(0)
+
+        owner.cancel()  # e.g. the client disconnected
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        release.set()
+
+        result = await waiter
+        assert result.token == "t"
+        assert calls == ["t"]  # one shared validation
+        assert (await cache.verify("t", verify_fn)).token == "t"
+        assert calls == ["t"]  # cached
+
+    asyncio.run(scenario())
+
+
+def test_upstream_failure_is_shared_but_not_cached():
+    async def scenario():
+        cache = TokenCache()
+        calls = []
+
+        async def verify_fn(token):
+            calls.append(token)
+            await asyncio.sleep(0.01)
+            raise ConnectionError("upstream down")
+
+        results = await asyncio.gather(
+            cache.verify("t", verify_fn), cache.verify("t", verify_fn), return_exceptions=True
+        )
+        assert all(isinstance(r, ConnectionError) for r in results)
+        assert calls == ["t"]
+        with pytest.raises(ConnectionError):
+            await cache.verify("t", verify_fn)
+        assert calls == ["t", "t"]
+
+    asyncio.run(scenario())
+
+
+def test_only_confirmed_rejections_are_cached():
+    async def scenario():
+        cache = TokenCache()
+        calls = []
+
+        async def verify_fn(token):
+            calls.append(token)
+            return None
+
+        for _ in range(2):
+            await cache.verify("flaky", verify_fn)
+            await cache.verify("bad", verify_fn, confirm_invalid=lambda token: True)
+        assert calls == ["flaky", "bad", "flaky"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,33 @@
+"""Each shipped mcp_manifest.json must match the schema generated from its code."""
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.registry import discover_manifests, manifest_from_code
+
+APPLICATIONS = Path(__file__).resolve().parents[3] / "03_Application"
+MANIFESTS = discover_manifests(APPLICATIONS)
+
+
+def _import_as_package(name: str, directory: Path) -> None:
+    """Make <directory> importable as `name` (the Dockerfile copies it to ./<name>/)."""
+    if name in sys.modules:
+        return
+    spec = importlib.util.spec_from_file_location(
+        name, directory / "__init__.py", submodule_search_locations=[str(directory)]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+
+
+@pytest.mark.parametrize("path", MANIFESTS, ids=[p.parent.name for p in MANIFESTS])
+def test_manifest_matches_code(path):
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    _import_as_package(manifest["module"].split(".")[0], path.parent)
+    assert manifest == manifest_from_code(manifest), (
+        f"{path} is stale: python -m app.registry {path}"
+    )
@@ -1,6 +1,9 @@
 import { useMemo, useState, useEffect } from "react";
 // Use type import for types to avoid runtime issues
 import { TableView, type Row, type SpecialAction } from "./components/TableView";
+import { usePagedRows } from "./hooks/usePagedRows";
+
+const API_BASE = "http://localhost:8000";
 
 type ViewMode = "sessions" | "exercises";
 
@@ -11,8 +14,12 @@ export default function App() {
   const [selectedWorkoutId, setSelectedWorkoutId] = useState<string | null>(null);
   const [selectedWorkoutMeta, setSelectedWorkoutMeta] = useState<{ date: string; split: string } | null>(null);
 
+  // Sessions: cursor-paged, fetched as the table scrolls; loaded pages are
+  // cached, so coming back from an exercise view does not refetch them.
+  const sessions = usePagedRows(`${API_BASE}/api/workouts`);
+
   const [rows, setRows] = useState<Row[]>([]);
-  const [loading, setLoading] = useState(true);
+  const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   const sessionColumns = useMemo(
@@ -40,39 +47,11 @@ export default function App() {
     []
   );
 
-  const fetchSessions = async () => {
-    try {
-      console.log("Fetching sessions from API...");
-      setLoading(true);
-      const response = await fetch("http://localhost:8000/api/workouts");
-      console.log("Response received:", response.status);
-
-      if (!response.ok) {
-        throw new Error(`Failed to fetch sessions: ${response.status} ${response.statusText}`);
-      }
-
-      const data = await response.json();
-      console.log("Data payload:", data);
-
-      if (!Array.isArray(data)) {
-        throw new Error("API response is not an array");
-      }
-
-      setRows(data);
-      setError(null);
-    } catch (err) {
-      console.error("Error in fetchSessions:", err);
-      setError(err instanceof Error ? err.message : "An unknown error occurred");
-    } finally {
-      setLoading(false);
-    }
-  };
-
   const fetchExercises = async (workoutId: string) => {
     try {
       console.log(`Fetching exercises for workout ${workoutId}...`);
       setLoading(true);
-      const response = await fetch(`http://localhost:8000/api/workouts/${workoutId}/exercises`);
+      const response = await fetch(`${API_BASE}/api/workouts/${workoutId}/exercises`);
       console.log("Response received:", response.status);
 
       if (!response.ok) {
@@ -97,9 +76,7 @@ export default function App() {
   };
 
   useEffect(() => {
-    if (viewMode === "sessions") {
-      fetchSessions();
-    } else if (viewMode === "exercises" && selectedWorkoutId) {
+    if (viewMode === "exercises" && selectedWorkoutId) {
       fetchExercises(selectedWorkoutId);
     }
   }, [viewMode, selectedWorkoutId]);
@@ -107,7 +84,7 @@ export default function App() {
   const onDeleteSession = (row: Row) => {
     if (window.confirm(`Are you sure you want to delete session ${row.workout_id}?`)) {
       // TODO: Call DELETE API endpoint
-      setRows((prev) => prev.filter((r) => r.workout_id !== row.workout_id));
+      sessions.removeRows((r) => r.workout_id === row.workout_id);
     }
   };
 
@@ -141,7 +118,10 @@ export default function App() {
     setSelectedWorkoutMeta(null);
   };
 
-  if (loading) {
+  const showLoading = viewMode === "sessions" ? !sessions.loaded && !sessions.error : loading;
+  const shownError = viewMode === "sessions" ? sessions.error : error;
+
+  if (showLoading) {
     return (
       <div style={{ padding: 20, fontFamily: "sans-serif" }}>
         <h2>Loading...</h2>
@@ -150,11 +130,11 @@ export default function App() {
     );
   }
 
-  if (error) {
+  if (shownError) {
     return (
       <div style={{ padding: 20, fontFamily: "sans-serif", color: "red" }}>
         <h2>Error Loading Data</h2>
-        <p>{error}</p>
+        <p>{shownError}</p>
         <button onClick={() => window.location.reload()}>Retry</button>
       </div>
     );
@@ -194,7 +174,11 @@ export default function App() {
       <TableView
         title="Atlas UI – Workout Sessions"
         columns={sessionColumns}
-        rows={rows}
+        rows={sessions.rows}
+        totalRows={sessions.total}
+        onEndReached={sessions.loadMore}
+        rowHeight={44}
+        height={Math.max(320, window.innerHeight - 160)}
         onDelete={onDeleteSession}
         special={viewSessionExercises}
       />
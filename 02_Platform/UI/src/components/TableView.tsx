@@ -1,3 +1,4 @@
+import { useEffect, useState, type CSSProperties } from "react";
 
 export type Row = Record<string, any>;
 
@@ -12,16 +13,46 @@ export interface TableViewProps {
     onDelete?: (row: Row) => void;
     special?: SpecialAction;
     title?: string;
+
+    // Windowed rendering: set rowHeight (px, fixed per row) and only the rows
+    // in view (+ overscan) are in the DOM; spacer rows keep the scroll height.
+    rowHeight?: number;
+    height?: number; // scroll viewport height (px), default 480
+    overscan?: number; // extra rows rendered above/below the viewport, default 8
+    // With incrementally loaded data `rows` is the loaded prefix:
+    totalRows?: number; // expected row count (e.g. a paged API's total_estimate)
+    onEndReached?: () => void; // viewport is within `overscan` rows of the loaded end
 }
 
 export function TableView(props: TableViewProps) {
-    const { columns, rows, onDelete, special, title } = props;
+    const { columns, rows, onDelete, special, title, rowHeight, height = 480, overscan = 8, totalRows, onEndReached } = props;
+    const [scrollTop, setScrollTop] = useState(0);
+
+    const rh = rowHeight ?? 0;
+    const windowed = rh > 0;
+    const count = windowed ? Math.max(rows.length, totalRows ?? 0) : rows.length;
+    const firstVisible = windowed ? Math.floor(scrollTop / rh) : 0;
+    const visibleCount = windowed ? Math.ceil(height / rh) : rows.length;
+    const start = windowed ? Math.min(Math.max(0, firstVisible - overscan), rows.length) : 0;
+    const end = windowed ? Math.min(Math.max(start, firstVisible + visibleCount + overscan), rows.length) : rows.length;
+    const nearEnd = windowed && firstVisible + visibleCount + overscan >= rows.length;
+
+    useEffect(() => {
+        if (nearEnd) onEndReached?.();
+    }, [nearEnd, rows.length, onEndReached]);
+
+    const colSpan = columns.length + (special || onDelete ? 1 : 0);
+    const cellHeight: CSSProperties = windowed ? { height: rh, boxSizing: "border-box" } : {};
+    const stickyHeader: CSSProperties = windowed ? { position: "sticky", top: 0, background: "Canvas" } : {};
 
     return (
         <div style={{ padding: 16, fontFamily: "system-ui, sans-serif" }}>
             {title && <h2 style={{ marginTop: 0 }}>{title}</h2>}
 
-            <div style={{ overflowX: "auto" }}>
+            <div
+                style={windowed ? { overflow: "auto", height } : { overflowX: "auto" }}
+                onScroll={windowed ? (e) => setScrollTop(e.currentTarget.scrollTop) : undefined}
+            >
                 <table style={{ width: "100%", borderCollapse: "collapse" }}>
                     <thead>
                         <tr>
@@ -33,6 +64,7 @@ export function TableView(props: TableViewProps) {
                                         padding: "10px 8px",
                                         borderBottom: "1px solid #ddd",
                                         whiteSpace: "nowrap",
+                                        ...stickyHeader,
                                     }}
                                 >
                                     {c.label}
@@ -45,6 +77,7 @@ export function TableView(props: TableViewProps) {
                                         padding: "10px 8px",
                                         borderBottom: "1px solid #ddd",
                                         whiteSpace: "nowrap",
+                                        ...stickyHeader,
                                     }}
                                 >
                                     Actions
@@ -54,15 +87,17 @@ export function TableView(props: TableViewProps) {
                     </thead>
 
                     <tbody>
-                        {rows.length === 0 ? (
+                        {count === 0 ? (
                             <tr>
-                                <td colSpan={columns.length + (special || onDelete ? 1 : 0)} style={{ padding: 12, color: "#666" }}>
+                                <td colSpan={colSpan} style={{ padding: 12, color: "#666" }}>
                                     No items found
                                 </td>
                             </tr>
                         ) : (
-                            rows.map((row, i) => (
-                                <tr key={row.workout_id || row.id || i}>
+                            <>
+                            {start > 0 && <SpacerRow colSpan={colSpan} height={start * rh} />}
+                            {rows.slice(start, end).map((row, offset) => (
+                                <tr key={row.workout_id || row.id || start + offset}>
                                     {columns.map((c) => (
                                         <td
                                             key={c.key}
@@ -70,6 +105,7 @@ export function TableView(props: TableViewProps) {
                                                 padding: "10px 8px",
                                                 borderBottom: "1px solid #f0f0f0",
                                                 whiteSpace: "nowrap",
+                                                ...cellHeight,
                                             }}
                                         >
                                             {String(row[c.key] ?? "")}
@@ -83,6 +119,7 @@ export function TableView(props: TableViewProps) {
                                                 borderBottom: "1px solid #f0f0f0",
                                                 textAlign: "right",
                                                 whiteSpace: "nowrap",
+                                                ...cellHeight,
                                             }}
                                         >
                                             {special && (
@@ -94,7 +131,9 @@ export function TableView(props: TableViewProps) {
                                         </td>
                                     )}
                                 </tr>
-                            ))
+                            ))}
+                            {end < count && <SpacerRow colSpan={colSpan} height={(count - end) * rh} />}
+                            </>
                         )}
                     </tbody>
                 </table>
@@ -102,3 +141,12 @@ export function TableView(props: TableViewProps) {
         </div>
     );
 }
+
+// Stands in for rows outside the rendered window (or not loaded yet)
+function SpacerRow({ colSpan, height }: { colSpan: number; height: number }) {
+    return (
+        <tr aria-hidden="true">
+            <td colSpan={colSpan} style={{ height, padding: 0, border: "none" }} />
+        </tr>
+    );
+}
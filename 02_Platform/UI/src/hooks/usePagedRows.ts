@@ -0,0 +1,139 @@
+import { useCallback, useEffect, useRef, useState } from "react";
+import type { Row } from "../components/TableView";
+
+/**
+ * Paged list contract (e.g. GET /api/workouts?cursor=&limit=):
+ * `next_cursor` is opaque and null on the last page; `total_estimate`
+ * may be null on continuation pages.
+ */
+export type Page = {
+  items: Row[];
+  next_cursor: string | null;
+  limit: number;
+  total_estimate: number | null;
+};
+
+function pageUrl(endpoint: string, cursor: string | null, limit: number): string {
+  const url = new URL(endpoint);
+  url.searchParams.set("limit", String(limit));
+  if (cursor) url.searchParams.set("cursor", cursor);
+  return url.toString();
+}
+
+async function fetchPage(
+  pageCache: Map<string, Page>,
+  endpoint: string,
+  cursor: string | null,
+  limit: number
+): Promise<Page> {
+  const url = pageUrl(endpoint, cursor, limit);
+  const cached = pageCache.get(url);
+  if (cached) return cached;
+
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`Failed to fetch ${endpoint}: ${response.status} ${response.statusText}`);
+  }
+  const page = await response.json();
+  if (!Array.isArray(page?.items)) {
+    throw new Error("API response is not a page ({ items, next_cursor })");
+  }
+  pageCache.set(url, page);
+  return page;
+}
+
+type State = {
+  rows: Row[];
+  total: number | null;
+  nextCursor: string | null;
+  loaded: boolean;
+};
+
+const EMPTY: State = { rows: [], total: null, nextCursor: null, loaded: false };
+
+/**
+ * Rows of a cursor-paged endpoint, loaded incrementally.
+ * Pair with a windowed TableView: pass `rows`, `total` as totalRows and
+ * `loadMore` as onEndReached.
+ */
+export function usePagedRows(endpoint: string, limit = 50) {
+  const [state, setState] = useState<State>(EMPTY);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+  const inFlight = useRef<string | null>(null);
+  // Loaded pages by request URL, owned by this hook instance: re-mounting a
+  // list (e.g. after a write elsewhere) fetches fresh pages, and refresh /
+  // removeRows clear it after this list's own mutations.
+  const pageCache = useRef(new Map<string, Page>());
+
+  const load = useCallback(
+    async (cursor: string | null) => {
+      const key = cursor ?? "";
+      if (inFlight.current === key) return;
+      inFlight.current = key;
+      setLoading(true);
+      try {
+        const page = await fetchPage(pageCache.current, endpoint, cursor, limit);
+        setState((prev) => ({
+          rows: cursor ? [...prev.rows, ...page.items] : page.items,
+          total: page.total_estimate ?? prev.total,
+          nextCursor: page.next_cursor,
+          loaded: true,
+        }));
+        setError(null);
+      } catch (err) {
+        console.error("Error in usePagedRows:", err);
+        setError(err instanceof Error ? err.message : "An unknown error occurred");
+      } finally {
+        if (inFlight.current === key) inFlight.current = null;
+        setLoading(false);
+      }
+    },
+    [endpoint, limit]
+  );
+
+  useEffect(() => {
+    pageCache.current.clear();
+    setState(EMPTY);
+    load(null);
+  }, [load]);
+
+  const loadMore = useCallback(() => {
+    if (state.loaded && state.nextCursor) load(state.nextCursor);
+  }, [load, state.loaded, state.nextCursor]);
+
+  /** Drop cached pages and start over from the first page (after mutations). */
+  const refresh = useCallback(() => {
+    pageCache.current.clear();
+    setState(EMPTY);
+    load(null);
+  }, [load]);
+
+  /** Remove rows locally; cached pages are dropped so a refetch stays consistent. */
+  const removeRows = useCallback(
+    (predicate: (row: Row) => boolean) => {
+      pageCache.current.clear();
+      setState((prev) => {
+        const rows = prev.rows.filter((r) => !predicate(r));
+        const removed = prev.rows.length - rows.length;
+        return { ...prev, rows, total: prev.total === null ? null : prev.total - removed };
+      });
+    },
+    []
+  );
+
+  // Unknown total: assume one more page while there is a next cursor
+  const total = state.total ?? state.rows.length + (state.nextCursor ? limit : 0);
+
+  return {
+    rows: state.rows,
+    total,
+    hasMore: state.nextCursor !== null,
+    loaded: state.loaded,
+    loading,
+    error,
+    loadMore,
+    refresh,
+    removeRows,
+  };
+}
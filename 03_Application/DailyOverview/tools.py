@@ -0,0 +1,176 @@
+"""
+DailyOverview domain tools — nutrition and training lined up per day.
+
+Plain functions — no FastMCP dependency.
+Registered into 02_Platform/MCPGateway via mcp_manifest.json.
+
+Reads two application contracts (read-only):
+  - food_logs            (foodtracker_schema.sql)
+  - workout.workout_log  (workout_schema.sql)
+"""
+import asyncio
+import os
+from datetime import date, timedelta
+from typing import Optional
+
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+from platform_observability.pg import AsyncInstrumentedCursor
+
+
+# ---------------------------------------------------------------------------
+# DB connection pool
+# ---------------------------------------------------------------------------
+
+_pool: Optional[AsyncConnectionPool] = None
+_pool_lock = asyncio.Lock()
+
+
+async def _get_pool() -> AsyncConnectionPool:
+    """
+    Shared async pool, opened on first use (inside the server's event loop).
+    max_size 2 is enough: one connection per fan-out branch.
+    """
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            pool = AsyncConnectionPool(
+                kwargs={
+                    "host": "127.0.0.1",
+                    "port": int(os.environ.get("ATLAS_PG_PORT", 5432)),
+                    "dbname": os.environ["ATLAS_PG_DB"],
+                    "user": os.environ["ATLAS_PG_USER"],
+                    "password": os.environ["ATLAS_PG_PASSWORD"],
+                    "row_factory": dict_row,
+                    "cursor_factory": AsyncInstrumentedCursor,
+                    "autocommit": True,
+                },
+                min_size=1,
+                max_size=int(os.environ.get("DAILYOVERVIEW_PG_POOL_MAX", 2)),
+                open=False,
+            )
+            await pool.open()
+            _pool = pool
+    return _pool
+
+
+async def _fetch(sql: str, params: tuple) -> list[dict]:
+    pool = await _get_pool()
+    async with pool.connection() as con:
+        cur = await con.execute(sql, params)
+        return await cur.fetchall()
+
+
+# ---------------------------------------------------------------------------
+# Queries (one per application contract)
+# ---------------------------------------------------------------------------
+
+NUTRITION_BY_DAY = """
+    SELECT
+        DATE(logged_at)                AS day,
+        COUNT(*)                       AS meal_count,
+        COALESCE(SUM(kcal),      0)    AS kcal,
+        COALESCE(SUM(protein_g), 0)    AS protein_g,
+        COALESCE(SUM(carbs_g),   0)    AS carbs_g,
+        COALESCE(SUM(fat_g),     0)    AS fat_g,
+        COALESCE(SUM(fiber_g),   0)    AS fiber_g
+    FROM food_logs
+    WHERE logged_at >= %s::date AND logged_at < %s::date + INTERVAL '1 day'
+    GROUP BY DATE(logged_at)
+"""
+
+TRAINING_BY_DAY = """
+    SELECT
+        workout_date                                       AS day,
+        COUNT(DISTINCT workout_id)                         AS sessions,
+        STRING_AGG(DISTINCT split, ', ')                   AS splits,
+        COUNT(*)                                           AS exercises,
+        SUM(  (set1_reps IS NOT NULL)::int + (set2_reps IS NOT NULL)::int
+            + (set3_reps IS NOT NULL)::int + (set4_reps IS NOT NULL)::int
+            + (set5_reps IS NOT NULL)::int)                AS sets,
+        SUM(  COALESCE(set1_reps, 0) + COALESCE(set2_reps, 0)
+            + COALESCE(set3_reps, 0) + COALESCE(set4_reps, 0)
+            + COALESCE(set5_reps, 0))                      AS reps,
+        COALESCE(SUM(COALESCE(weight_kg, 0) * (
+              COALESCE(set1_reps, 0) + COALESCE(set2_reps, 0)
+            + COALESCE(set3_reps, 0) + COALESCE(set4_reps, 0)
+            + COALESCE(set5_reps, 0))), 0)                 AS volume_kg
+    FROM workout.workout_log
+    WHERE workout_date BETWEEN %s AND %s
+    GROUP BY workout_date
+"""
+
+
+def _round_values(row: dict) -> dict:
+    out = {}
+    for k, v in row.items():
+        if k == "day":
+            continue
+        if isinstance(v, (int, str)) or v is None:
+            out[k] = v
+        else:
+            out[k] = round(float(v), 1)
+    return out
+
+
+def _avg(values: list[float]) -> Optional[float]:
+    return round(sum(values) / len(values), 1) if values else None
+
+
+# ---------------------------------------------------------------------------
+# Tools
+# ---------------------------------------------------------------------------
+
+async def get_daily_overview(from_date: str, to_date: str) -> dict:
+    """
+    Nutrition and training side by side, one entry per calendar day.
+
+    from_date: ISO date string e.g. "2026-02-16" (inclusive)
+    to_date:   ISO date string e.g. "2026-02-22" (inclusive)
+
+    Returns:
+      - period: the queried date range
+      - days: one entry per day with
+          nutrition: meal_count, kcal, protein_g, carbs_g, fat_g, fiber_g (null if nothing logged)
+          training:  sessions, splits, exercises, sets, reps, volume_kg (null if rest day)
+      - summary: training/rest day counts and average kcal/protein on
+        training vs. rest days (only days with logged food count)
+    """
+    start = date.fromisoformat(from_date)
+    end = date.fromisoformat(to_date)
+
+    # Both applications are queried concurrently on separate pooled connections
+    nutrition_rows, training_rows = await asyncio.gather(
+        _fetch(NUTRITION_BY_DAY, (start, end)),
+        _fetch(TRAINING_BY_DAY, (start, end)),
+    )
+    nutrition = {r["day"]: _round_values(r) for r in nutrition_rows}
+    training = {r["day"]: _round_values(r) for r in training_rows}
+
+    days = []
+    kcal = {"training": [], "rest": []}
+    protein = {"training": [], "rest": []}
+    day = start
+    while day <= end:
+        n = nutrition.get(day)
+        t = training.get(day)
+        days.append({"date": day.isoformat(), "nutrition": n, "training": t})
+        if n is not None:
+            kind = "training" if t is not None else "rest"
+            kcal[kind].append(n["kcal"])
+            protein[kind].append(n["protein_g"])
+        day += timedelta(days=1)
+
+    return {
+        "period": {"from": from_date, "to": to_date},
+        "days": days,
+        "summary": {
+            "training_days": len(training),
+            "rest_days": len(days) - len(training),
+            "days_with_food_logged": len(nutrition),
+            "avg_kcal_training_days": _avg(kcal["training"]),
+            "avg_kcal_rest_days": _avg(kcal["rest"]),
+            "avg_protein_g_training_days": _avg(protein["training"]),
+            "avg_protein_g_rest_days": _avg(protein["rest"]),
+        },
+    }
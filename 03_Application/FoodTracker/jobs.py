@@ -0,0 +1,14 @@
+"""
+FoodTracker background jobs.
+
+Plain functions, scheduled by the MCPGateway from the "jobs" section of
+mcp_manifest.json (platform_scheduler; runs in platform.job_run).
+"""
+from platform_scheduler.maintenance import analyze_if_changed
+
+from foodtracker.tools import _pg
+
+
+def analyze_food_logs() -> dict:
+    """Refresh planner statistics after bulk meal imports (no-op otherwise)."""
+    return analyze_if_changed(_pg, ["public.food_logs"], min_changes=200)
@@ -11,6 +11,7 @@ from typing import Optional
 
 import psycopg
 from psycopg.rows import dict_row
+from platform_observability.pg import InstrumentedCursor
 
 
 # ---------------------------------------------------------------------------
@@ -18,7 +19,10 @@ from psycopg.rows import dict_row
 # ---------------------------------------------------------------------------
 
 def _pg():
-    """Open a Postgres connection using Atlas platform env vars."""
+    """
+    Open a Postgres connection using Atlas platform env vars.
+    Statements are timed into the gateway's request trace (platform_observability).
+    """
     return psycopg.connect(
         host="127.0.0.1",
         port=int(os.environ.get("ATLAS_PG_PORT", 5432)),
@@ -26,6 +30,7 @@ def _pg():
         user=os.environ["ATLAS_PG_USER"],
         password=os.environ["ATLAS_PG_PASSWORD"],
         row_factory=dict_row,
+        cursor_factory=InstrumentedCursor,
     )
 
 
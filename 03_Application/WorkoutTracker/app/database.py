@@ -1,11 +1,14 @@
 import os
 import psycopg
 from psycopg.rows import dict_row
+from platform_observability.pg import InstrumentedCursor
 
 def get_connection():
     """
     Establishes a connection to the Postgres database using environment variables.
     Returns a connection object.
+    Statements over ATLAS_SLOW_QUERY_MS are captured to platform.slow_query_log
+    (platform_observability.slowquery).
     """
     try:
         conn = psycopg.connect(
@@ -15,6 +18,7 @@ def get_connection():
             host="127.0.0.1", # Assuming running on host accessing docker port
             port=os.environ.get("ATLAS_PG_PORT", "5432"),
             row_factory=dict_row,
+            cursor_factory=InstrumentedCursor,
             autocommit=True # Simplified for this app
         )
         return conn
@@ -0,0 +1,181 @@
+"""
+Response pipeline: compression, cache headers, content-hashed static URLs.
+
+    install_http_pipeline(app, static_dir, templates)
+
+- /static is served by HashedStaticFiles. Templates link assets through
+  static_url("app.css") -> /static/app.<hash>.css; the hash is taken from
+  the file content, so a changed file gets a new URL and the hashed URL can
+  be cached for a year ("immutable"). Unhashed or stale-hash URLs still
+  resolve (an old page during a deploy) but must be revalidated.
+- Responses larger than minimum_size are compressed: brotli when the client
+  accepts it and brotli-asgi is installed (extra "brotli"), gzip otherwise.
+- Pages and API responses get "Cache-Control: no-cache" unless the route set
+  its own; 5xx responses always get "no-store". Every compressible content
+  type carries "Vary: Accept-Encoding", also when it was too small to be
+  compressed, so a shared cache (e.g. the tunnel edge) never hands a br
+  body to a client that did not ask for one. A 304 has no Content-Type but
+  must carry the Vary of the 200 it revalidates; its type is guessed from
+  the path (pages and API routes count as compressible).
+- The header middleware wraps the whole stack, ServerErrorMiddleware
+  included, so the 500 sent for an unhandled exception gets these headers
+  as well.
+"""
+import hashlib
+import logging
+import mimetypes
+import re
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.staticfiles import StaticFiles
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # optional extra; gzip only
+    BrotliMiddleware = None
+
+log = logging.getLogger("workouttracker")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+NO_STORE = "no-store"
+
+_HASHED_NAME = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{12})(?P<suffix>\.[^./]+)$")
+_COMPRESSIBLE = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+
+class HashedStaticFiles(StaticFiles):
+    def __init__(self, *args, prefix: str = "/static", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prefix = prefix.rstrip("/")
+        self._hashes: dict[str, tuple[tuple, str]] = {}
+
+    def content_hash(self, path: str) -> Optional[str]:
+        """First 12 hex digits of the file's sha256 (None if it does not exist)."""
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None:
+            return None
+        key = (full_path, stat_result.st_mtime_ns, stat_result.st_size)
+        cached = self._hashes.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with open(full_path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        self._hashes[path] = (key, digest)
+        return digest
+
+    def url(self, path: str) -> str:
+        digest = self.content_hash(path)
+        if digest is None:
+            log.warning("static_url: %s not found in %s", path, self.directory)
+            return f"{self.prefix}/{path}"
+        stem, dot, suffix = path.rpartition(".")
+        if not dot or "/" in suffix:
+            return f"{self.prefix}/{path}.{digest}"
+        return f"{self.prefix}/{stem}.{digest}.{suffix}"
+
+    async def get_response(self, path: str, scope):
+        cache_control = REVALIDATE
+        match = _HASHED_NAME.match(path)
+        if match is not None and self.lookup_path(path)[1] is None:
+            path = match["stem"] + match["suffix"]
+            if self.content_hash(path) == match["hash"]:
+                cache_control = IMMUTABLE
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = cache_control
+        return response
+
+
+def _compressible(headers: MutableHeaders, status: int, path: str) -> bool:
+    content_type = headers.get("content-type")
+    if content_type is None and status == 304:
+        # Type of the 200 being revalidated: static files by extension,
+        # extensionless routes (pages, API) are HTML/JSON
+        content_type = mimetypes.guess_type(path)[0] or "text/html"
+    return (content_type or "").startswith(_COMPRESSIBLE)
+
+
+def _add_vary(headers: MutableHeaders, value: str) -> None:
+    present = [v.strip().lower() for v in headers.get("vary", "").split(",") if v.strip()]
+    if value.lower() not in present and "*" not in present:
+        headers.add_vary_header(value)
+
+
+class CacheHeadersMiddleware:
+    def __init__(self, app, default_cache_control: str = REVALIDATE):
+        self.app = app
+        self.default_cache_control = default_cache_control
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if message["status"] >= 500:
+                    headers["Cache-Control"] = NO_STORE
+                elif "cache-control" not in headers:
+                    headers["Cache-Control"] = self.default_cache_control
+                if _compressible(headers, message["status"], scope["path"]):
+                    _add_vary(headers, "Accept-Encoding")
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+class CompleteBodyMiddleware:
+    """
+    Mark a body as final once Content-Length bytes were sent.
+
+    BaseHTTPMiddleware (request-id handler) streams every response, so a
+    complete small body arrives with more_body=True and the compressor
+    would skip its minimum_size check. The empty trailing message is dropped.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        expected = None
+        sent = 0
+        done = False
+
+        async def send_complete(message):
+            nonlocal expected, sent, done
+            if message["type"] == "http.response.start":
+                length = MutableHeaders(scope=message).get("content-length")
+                expected = int(length) if length and length.isdigit() else None
+            elif message["type"] == "http.response.body":
+                if done:
+                    return
+                sent += len(message.get("body", b""))
+                if expected is not None and sent >= expected and message.get("more_body"):
+                    message = {**message, "more_body": False}
+                done = not message.get("more_body", False)
+            await send(message)
+
+        await self.app(scope, receive, send_complete)
+
+
+def install_http_pipeline(app, static_dir: str, templates, minimum_size: int = 500):
+    static = HashedStaticFiles(directory=static_dir)
+    app.mount("/static", static, name="static")
+    templates.env.globals["static_url"] = static.url
+
+    app.add_middleware(CompleteBodyMiddleware)
+    if BrotliMiddleware is not None:
+        app.add_middleware(BrotliMiddleware, minimum_size=minimum_size, gzip_fallback=True)
+    else:
+        app.add_middleware(GZipMiddleware, minimum_size=minimum_size)
+    # Outermost, outside the compressor (final Content-Type/Vary) and outside
+    # ServerErrorMiddleware, which sends the Exception handler's 500 itself
+    build_middleware_stack = app.build_middleware_stack
+    app.build_middleware_stack = lambda: CacheHeadersMiddleware(build_middleware_stack())
+    return static
@@ -0,0 +1,37 @@
+"""
+WorkoutTracker background jobs (platform_scheduler).
+
+Registered in main.py; status and latest runs at GET /api/scheduler,
+full history in platform.job_run.
+"""
+import os
+from datetime import timedelta
+
+from platform_scheduler.maintenance import analyze_if_changed
+from platform_scheduler.scheduler import Scheduler
+
+from app.database import get_connection
+from app.records import recompute_all
+
+WORKOUT_TABLES = ["workout.workout_log", "workout.workout_log_tombstone"]
+TOMBSTONE_RETENTION_DAYS = int(os.environ.get("WORKOUT_TOMBSTONE_RETENTION_DAYS", 30))
+
+
+def analyze_workout_tables() -> dict:
+    """Refresh planner statistics after bulk imports (no-op otherwise)."""
+    return analyze_if_changed(get_connection, WORKOUT_TABLES)
+
+
+def prune_tombstones() -> dict:
+    """Drop delete tombstones past retention; older sync tokens must resync."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT workout.prune_tombstones(make_interval(days => %s)) AS deleted",
+                        (TOMBSTONE_RETENTION_DAYS,))
+            return {"deleted": cur.fetchone()["deleted"]}
+
+
+def register_jobs(scheduler: Scheduler) -> None:
+    scheduler.add_job("workouttracker.analyze", analyze_workout_tables, every=timedelta(minutes=15))
+    scheduler.add_job("workouttracker.recompute_records", recompute_all, cron="15 3 * * *")
+    scheduler.add_job("workouttracker.prune_tombstones", prune_tombstones, cron="30 3 * * *")
@@ -1,10 +1,18 @@
-from fastapi import FastAPI, Request, Form, HTTPException, Depends
+from fastapi import FastAPI, Request, Form, HTTPException, Depends, Query
 from fastapi.responses import RedirectResponse, HTMLResponse
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import get_connection
+from app.http_cache import install_http_pipeline
+from app.jobs import register_jobs
+from app import records
 from app.models import WorkoutLogCreate
+from app.paging import (
+    decode_change_token,
+    decode_session_cursor,
+    encode_change_token,
+    encode_session_cursor,
+)
 import uuid
 from datetime import date
 from typing import Optional, List
@@ -15,6 +23,11 @@ import logging
 
 from platform_errorhandling.logging import setup_logging
 from platform_errorhandling.logFastapi import install_exception_handlers
+from platform_admission.asgi import install_admission_control
+from platform_admission.controller import AdmissionController, parse_limits
+from platform_observability import slowquery
+from platform_scheduler.asgi import install_scheduler
+from platform_scheduler.scheduler import Scheduler
 
 # App and Templates
 app = FastAPI(title="WorkoutTracker")
@@ -26,6 +39,22 @@ setup_logging(
 
 log = logging.getLogger("workouttracker")
 install_exception_handlers(app)
+slowquery.configure(app="workouttracker")
+
+# Admission control: bound concurrent requests (each holds a Postgres
+# connection) and shed bursts with 503 + Retry-After. Stats: /api/admission
+install_admission_control(app, AdmissionController(
+    max_concurrency=int(os.environ.get("WORKOUT_ADMISSION_MAX_CONCURRENCY", 4)),
+    max_queue=int(os.environ.get("WORKOUT_ADMISSION_MAX_QUEUE", 16)),
+    max_wait_seconds=float(os.environ.get("WORKOUT_ADMISSION_MAX_WAIT_SEC", 2)),
+    key_limits=parse_limits(os.environ.get("WORKOUT_ADMISSION_KEY_LIMITS")),
+))
+
+# Background jobs (app/jobs.py), started with the server; runs are leased
+# through Postgres so several instances do not repeat a job. Status: /api/scheduler
+scheduler = Scheduler(app="workouttracker", connect=get_connection)
+register_jobs(scheduler)
+install_scheduler(app, scheduler)
 
 # Enable CORS for local development
 app.add_middleware(
@@ -46,6 +75,15 @@ log.info("Template path: %s", search_path)
 templates = Jinja2Templates(directory=search_path)
 templates.env.add_extension('jinja2.ext.do')
 
+# Compression, cache headers and content-hashed /static URLs (static_url()
+# in templates). Added last, so it wraps the middleware above.
+install_http_pipeline(
+    app,
+    static_dir=os.path.join(BASE_DIR, "static"),
+    templates=templates,
+    minimum_size=int(os.environ.get("WORKOUT_COMPRESS_MIN_BYTES", 500)),
+)
+
 @app.get("/", response_class=HTMLResponse)
 async def root():
     return RedirectResponse(url="/workouts")
@@ -89,31 +127,181 @@ async def list_workouts(request: Request):
     })
 
 @app.get("/api/workouts")
-async def api_list_workouts():
+async def api_list_workouts(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+):
     """
-    JSON endpoint for all workout sessions.
+    JSON endpoint for workout sessions, newest first, one page at a time.
+
+    Returns {items, next_cursor, limit, total_estimate}. Pass next_cursor
+    back as `cursor` for the following page; it is null on the last page.
+    total_estimate (approximate number of sessions, from planner statistics;
+    null before the table was first analyzed) is only set on the first page.
     """
     with get_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute("""
+            # Keyset paging on (workout_date, workout_id), served by
+            # ix_workout_log_date_workout_id. All rows of a session share
+            # its date (update_meta changes them together).
+            params: list = []
+            keyset = ""
+            if cursor:
+                keyset = "WHERE (workout_date, workout_id) < (%s, %s)"
+                params.extend(decode_session_cursor(cursor))
+            cur.execute(f"""
                 SELECT 
                     workout_id, 
-                    MAX(workout_date) as workout_date, 
+                    workout_date, 
                     MAX(split) as split, 
                     COUNT(*) as exercise_count
                 FROM workout.workout_log
-                GROUP BY workout_id
-                ORDER BY workout_date DESC
-            """)
+                {keyset}
+                GROUP BY workout_date, workout_id
+                ORDER BY workout_date DESC, workout_id DESC
+                LIMIT %s
+            """, (*params, limit + 1))
             sessions = cur.fetchall()
-            
-            # Convert date objects to strings for JSON
-            for s in sessions:
-                if s['workout_date']:
-                    s['workout_date'] = s['workout_date'].isoformat()
-                s['workout_id'] = str(s['workout_id'])
-                
-    return sessions
+
+            total_estimate = None
+            if not cursor:
+                # Planner statistics instead of COUNT(DISTINCT): no table scan.
+                # n_distinct < 0 is a fraction of the row count.
+                cur.execute("""
+                    SELECT CASE WHEN s.n_distinct >= 0 THEN s.n_distinct
+                                ELSE -s.n_distinct * c.reltuples END AS estimate
+                    FROM pg_class c
+                    JOIN pg_stats s
+                      ON s.schemaname = 'workout' AND s.tablename = c.relname
+                     AND s.attname = 'workout_id'
+                    WHERE c.oid = 'workout.workout_log'::regclass AND c.reltuples >= 0
+                """)
+                row = cur.fetchone()
+                total_estimate = round(row['estimate']) if row else None
+
+    next_cursor = None
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        last = sessions[-1]
+        next_cursor = encode_session_cursor(last['workout_date'], last['workout_id'])
+
+    # Convert date objects to strings for JSON
+    for s in sessions:
+        if s['workout_date']:
+            s['workout_date'] = s['workout_date'].isoformat()
+        s['workout_id'] = str(s['workout_id'])
+
+    return {
+        "items": sessions,
+        "next_cursor": next_cursor,
+        "limit": limit,
+        "total_estimate": total_estimate,
+    }
+
+CHANGE_COLUMNS = """
+    workout_log_id, workout_id, workout_date, split, exercise, weight_kg, pause_sec,
+    set1_reps, set2_reps, set3_reps, set4_reps, set5_reps, comment, created_at, updated_at
+"""
+
+@app.get("/api/workouts/changes")
+async def api_workout_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+):
+    """
+    Delta-sync feed of workout.workout_log rows.
+
+    Without `since`: every row (initial load of a local replica). With
+    `since=<next_token of the previous response>`: rows inserted or updated
+    since then (`upserts`, full rows) and ids of rows deleted since then
+    (`deletes`, from tombstones). Apply both, keep next_token, and call
+    again right away while has_more is true.
+
+    Delivery is at-least-once: a row may be sent again, so apply upserts by
+    workout_log_id.
+
+    Tombstones are pruned after WORKOUT_TOMBSTONE_RETENTION_DAYS (jobs.py).
+    A sync that started before the last prune answers 410 (resync
+    required): drop the replica and reload without `since`. An initial load
+    (started without `since`) needs no tombstones and always completes.
+    """
+    after_xid, after_id, chain_watermark, start_xid = (
+        decode_change_token(since) if since else (0, -1, None, 0)
+    )
+
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            # Taken before reading: every transaction below it has finished
+            # and is visible to the reads that follow.
+            cur.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint AS xmin")
+            xmin = cur.fetchone()['xmin']
+            watermark = xmin if chain_watermark is None else min(chain_watermark, xmin)
+
+            position = (str(after_xid), after_id)
+            cur.execute(f"""
+                SELECT * FROM (
+                    SELECT 'upsert' AS op, change_xid, {CHANGE_COLUMNS}, NULL::timestamptz AS deleted_at
+                    FROM workout.workout_log
+                    WHERE (change_xid, workout_log_id) > (%s::xid8, %s)
+                  UNION ALL
+                    SELECT 'delete' AS op, change_xid, workout_log_id, workout_id,
+                           NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+                           deleted_at
+                    FROM workout.workout_log_tombstone
+                    WHERE (change_xid, workout_log_id) > (%s::xid8, %s)
+                ) changes
+                ORDER BY change_xid, workout_log_id
+                LIMIT %s
+            """, (*position, *position, limit + 1))
+            changes = cur.fetchall()
+
+            # Read after the feed: a prune that removed tombstones this read
+            # could have missed has committed, horizon included, by now.
+            # Checked against where the chain started, not this page's
+            # position: continuation pages of a fresh load may sit on rows
+            # far older than the horizon.
+            if start_xid > 0:
+                cur.execute("""
+                    SELECT horizon_xid::text::bigint AS horizon
+                    FROM workout.change_feed_horizon
+                """)
+                row = cur.fetchone()
+                if row and start_xid <= row['horizon']:
+                    raise HTTPException(
+                        status_code=410,
+                        detail="Sync token is older than the retained deletes: resync required",
+                    )
+
+    has_more = len(changes) > limit
+    if has_more:
+        changes = changes[:limit]
+        last = changes[-1]
+        next_token = encode_change_token(int(last['change_xid']), last['workout_log_id'],
+                                         watermark, start_xid)
+    else:
+        next_token = encode_change_token(watermark, -1)
+
+    upserts, deletes = [], []
+    for c in changes:
+        op = c.pop('op')
+        c.pop('change_xid')
+        if op == 'delete':
+            deletes.append({
+                "workout_log_id": c['workout_log_id'],
+                "workout_id": str(c['workout_id']),
+                "deleted_at": c['deleted_at'].isoformat(),
+            })
+        else:
+            c.pop('deleted_at')
+            c['workout_id'] = str(c['workout_id'])
+            upserts.append(c)
+
+    return {
+        "upserts": upserts,
+        "deletes": deletes,
+        "next_token": next_token,
+        "has_more": has_more,
+    }
 
 @app.get("/api/workouts/{id}/exercises")
 async def api_list_exercises(id: str):
@@ -218,7 +406,7 @@ async def create_workout(
         )
 
         with get_connection() as conn:
-            with conn.cursor() as cur:
+            with conn.transaction(), conn.cursor() as cur:
                 cur.execute("""
                     INSERT INTO workout.workout_log (
                         workout_id, workout_date, split, exercise, weight_kg, 
@@ -226,10 +414,12 @@ async def create_workout(
                     ) VALUES (
                         %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
                     )
+                    RETURNING workout_log_id
                 """, (
                     log.workout_id, log.workout_date, log.split, log.exercise, log.weight_kg,
                     log.set1_reps, log.set2_reps, log.set3_reps, log.set4_reps, log.set5_reps, log.comment
                 ))
+                records.record_log(cur, cur.fetchone()['workout_log_id'])
             conn.commit()
             
         return RedirectResponse(url=f"/workouts/{w_id}", status_code=303)
@@ -250,6 +440,9 @@ async def detail_workout(request: Request, id: str, copy_id: Optional[int] = Non
                 """, (w_id,))
                 logs = cur.fetchall()
                 
+                # PRs set in this session (index lookup, no history scan)
+                pr_by_log = records.records_for_logs(cur, [l["workout_log_id"] for l in logs])
+
                 prefill = None
                 if copy_id:
                     cur.execute("SELECT * FROM workout.workout_log WHERE workout_log_id = %s", (copy_id,))
@@ -273,6 +466,7 @@ async def detail_workout(request: Request, id: str, copy_id: Optional[int] = Non
             "request": request, 
             "logs": logs, 
             "meta": meta,
+            "records": pr_by_log,
             "prefill": prefill,
             "edit_id": edit_id
         })
@@ -292,9 +486,9 @@ async def update_workout_log(
     comment: Optional[str] = Form(None)
 ):
     with get_connection() as conn:
-        with conn.cursor() as cur:
+        with conn.transaction(), conn.cursor() as cur:
             # Get workout_id first to redirect
-            cur.execute("SELECT workout_id FROM workout.workout_log WHERE workout_log_id = %s", (log_id,))
+            cur.execute("SELECT workout_id, exercise FROM workout.workout_log WHERE workout_log_id = %s", (log_id,))
             row = cur.fetchone()
             if not row:
                 return HTMLResponse("Log not found", status_code=404)
@@ -307,6 +501,9 @@ async def update_workout_log(
                     comment = %s, updated_at = NOW()
                 WHERE workout_log_id = %s
             """, (exercise, weight_kg, set1_reps, set2_reps, set3_reps, set4_reps, set5_reps, comment, log_id))
+            records.record_log(cur, log_id)
+            if row['exercise'] != exercise:
+                records.recompute(cur, [row['exercise']])
         conn.commit()
     return RedirectResponse(url=f"/workouts/{w_id}", status_code=303)
 
@@ -314,7 +511,7 @@ async def update_workout_log(
 async def delete_workout_log(log_id: int):
     log.debug("Deleting workout log %s", log_id)
     with get_connection() as conn:
-        with conn.cursor() as cur:
+        with conn.transaction(), conn.cursor() as cur:
             # Get workout_id first to redirect
             cur.execute("SELECT workout_id FROM workout.workout_log WHERE workout_log_id = %s", (log_id,))
             row = cur.fetchone()
@@ -324,8 +521,9 @@ async def delete_workout_log(log_id: int):
             w_id = row['workout_id']
             
             # Delete
-            cur.execute("DELETE FROM workout.workout_log WHERE workout_log_id = %s", (log_id,))
+            cur.execute("DELETE FROM workout.workout_log WHERE workout_log_id = %s RETURNING exercise", (log_id,))
             log.debug("Delete affected %s rows", cur.rowcount)
+            records.recompute(cur, [r['exercise'] for r in cur.fetchall()])
 
             # Check if session still has exercises
             cur.execute("SELECT COUNT(*) FROM workout.workout_log WHERE workout_id = %s", (w_id,))
@@ -348,14 +546,16 @@ async def update_workout_meta(
         w_id = uuid.UUID(id)
         new_date = date.fromisoformat(workout_date)
         with get_connection() as conn:
-            with conn.cursor() as cur:
+            with conn.transaction(), conn.cursor() as cur:
                 cur.execute("""
                     UPDATE workout.workout_log SET
                         workout_date = %s,
                         split = %s,
                         updated_at = NOW()
                     WHERE workout_id = %s
+                    RETURNING exercise
                 """, (new_date, split, w_id))
+                records.recompute(cur, [r['exercise'] for r in cur.fetchall()])
             conn.commit()
         return RedirectResponse(url=f"/workouts/{w_id}", status_code=303)
     except Exception as e:
@@ -367,9 +567,10 @@ async def delete_workout_session(id: str):
     try:
         w_id = uuid.UUID(id)
         with get_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("DELETE FROM workout.workout_log WHERE workout_id = %s", (w_id,))
-                conn.commit()
+            with conn.transaction(), conn.cursor() as cur:
+                cur.execute("DELETE FROM workout.workout_log WHERE workout_id = %s RETURNING exercise", (w_id,))
+                records.recompute(cur, [r['exercise'] for r in cur.fetchall()])
+            conn.commit()
         return RedirectResponse(url="/workouts", status_code=303)
     except Exception as e:
         return HTMLResponse(content=f"Error deleting session: {e}", status_code=400)
@@ -382,7 +583,7 @@ async def copy_workout_session(id: str):
         today = date.today()
         
         with get_connection() as conn:
-            with conn.cursor() as cur:
+            with conn.transaction(), conn.cursor() as cur:
                 # Get the split name from the original session
                 cur.execute("SELECT split FROM workout.workout_log WHERE workout_id = %s LIMIT 1", (w_id,))
                 row = cur.fetchone()
@@ -411,10 +612,12 @@ async def copy_workout_session(id: str):
                         ) VALUES (
                             %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
                         )
+                        RETURNING workout_log_id
                     """, (
                         new_w_id, today, split, ex['exercise'], ex['weight_kg'], ex['pause_sec'],
                         ex['set1_reps'], ex['set2_reps'], ex['set3_reps'], ex['set4_reps'], ex['set5_reps'], ex['comment']
                     ))
+                    records.record_log(cur, cur.fetchone()['workout_log_id'])
             conn.commit()
             
         return RedirectResponse(url=f"/workouts/{new_w_id}", status_code=303)
@@ -438,7 +641,7 @@ async def add_exercise_to_workout(
     # We'll fetch them for safety.
     w_id = uuid.UUID(id)
     with get_connection() as conn:
-        with conn.cursor() as cur:
+        with conn.transaction(), conn.cursor() as cur:
             cur.execute("SELECT workout_date, split FROM workout.workout_log WHERE workout_id = %s LIMIT 1", (w_id,))
             row = cur.fetchone()
             if not row:
@@ -454,10 +657,12 @@ async def add_exercise_to_workout(
                 ) VALUES (
                     %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
                 )
+                RETURNING workout_log_id
             """, (
                 w_id, workout_date, split, exercise, weight_kg,
                 set1_reps, set2_reps, set3_reps, set4_reps, set5_reps, comment
             ))
+            records.record_log(cur, cur.fetchone()['workout_log_id'])
         conn.commit()
     
     return RedirectResponse(url=f"/workouts/{w_id}", status_code=303)
@@ -0,0 +1,84 @@
+"""
+Opaque cursors and sync tokens for paged JSON endpoints.
+
+A cursor encodes the sort key of the last row of a page; the next page
+continues strictly after it. Clients treat cursors and tokens as opaque
+strings.
+"""
+import base64
+import json
+import uuid
+from datetime import date
+from typing import Any, Optional
+
+from fastapi import HTTPException
+
+
+def _encode(value: Any) -> str:
+    raw = json.dumps(value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(text: str) -> Any:
+    return json.loads(base64.urlsafe_b64decode(text + "=" * (-len(text) % 4)))
+
+
+def encode_session_cursor(workout_date: date, workout_id: uuid.UUID) -> str:
+    return _encode([workout_date.isoformat(), str(workout_id)])
+
+
+def decode_session_cursor(cursor: str) -> tuple[date, uuid.UUID]:
+    try:
+        workout_date, workout_id = _decode(cursor)
+        return date.fromisoformat(workout_date), uuid.UUID(workout_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# ---------------------------------------------------------------------------
+# Change-feed tokens (GET /api/workouts/changes)
+#
+# Position in the feed = (change_xid, workout_log_id): everything at or before
+# it has been delivered. A complete sync ends on the watermark
+# (xmin, -1) so transactions still running at that point are re-read next
+# time. A continuation token (more pages follow) also carries the lowest
+# watermark seen in the chain, so the final token cannot overtake a
+# transaction that was still running when the chain started, and the xid
+# the chain started from (0 for an initial load). Tombstone retention is
+# checked against that start: pages of one chain all continue from it.
+# ---------------------------------------------------------------------------
+
+# xid8 and bigint ids are signed 64-bit on the SQL side
+_MAX_ID = 2**63
+
+
+def _valid_change_token(parts: Any) -> bool:
+    if not (isinstance(parts, list) and 2 <= len(parts) <= 4
+            and all(type(p) is int for p in parts)):
+        return False
+    xid, log_id, *xids = parts
+    return (0 <= xid < _MAX_ID and -1 <= log_id < _MAX_ID
+            and all(0 <= x < _MAX_ID for x in xids))
+
+
+def encode_change_token(xid: int, log_id: int, watermark: Optional[int] = None,
+                        start_xid: int = 0) -> str:
+    if watermark is None:
+        return _encode([xid, log_id])
+    return _encode([xid, log_id, watermark, start_xid])
+
+
+def decode_change_token(token: str) -> tuple[int, int, Optional[int], int]:
+    """(xid, log_id, chain watermark or None, xid the chain started from)."""
+    try:
+        parts = _decode(token)
+        if not _valid_change_token(parts):
+            raise ValueError(token)
+        xid, log_id = parts[0], parts[1]
+        if len(parts) == 2:
+            return xid, log_id, None, xid
+        # Continuation tokens issued before the start was recorded: assume
+        # the chain started here (stricter, never misses a prune)
+        return xid, log_id, parts[2], parts[3] if len(parts) == 4 else xid
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
@@ -0,0 +1,79 @@
+"""
+Personal records (workout.exercise_pr / workout.exercise_reps_pr).
+
+The tables are kept current on write, so pages can show PRs without
+scanning an exercise's history:
+
+- after inserting or updating a log row: record_log(cur, log_id)
+- after deleting rows or changing session dates: recompute(cur, exercises)
+
+Run the write and the record update in one transaction
+(conn.transaction(); get_connection is autocommit): the SQL functions take
+an advisory lock that serializes record maintenance until commit, so two
+concurrent writes never build records from each other's uncommitted state,
+and a failed update rolls the write back with it.
+
+The SQL side (workout_schema.sql: workout_log_metrics, pr_apply,
+pr_recompute) defines the metrics and tie-breaks. The nightly
+"workouttracker.recompute_records" job rebuilds everything, which also
+repairs records missed by a write that failed halfway.
+"""
+from typing import Iterable
+
+from app.database import get_connection
+
+RECORD_LABELS = {
+    "max_weight": "Weight",
+    "e1rm": "e1RM",
+    "volume": "Volume",
+    "reps": "Reps",
+}
+
+
+def record_log(cur, log_id: int) -> None:
+    cur.execute("SELECT workout.pr_apply(%s)", (log_id,))
+
+
+def recompute(cur, exercises: Iterable[str]) -> None:
+    exercises = sorted(set(exercises))
+    if exercises:
+        cur.execute("SELECT workout.pr_recompute(%s)", (exercises,))
+
+
+def recompute_all() -> dict:
+    """Rebuild all records from workout_log (scheduled nightly)."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT workout.pr_recompute(NULL)")
+            cur.execute("SELECT COUNT(*) AS records FROM workout.exercise_pr")
+            records = cur.fetchone()["records"]
+            cur.execute("SELECT COUNT(*) AS reps_records FROM workout.exercise_reps_pr")
+            reps_records = cur.fetchone()["reps_records"]
+    return {"records": records, "reps_records": reps_records}
+
+
+def records_for_logs(cur, log_ids: list[int]) -> dict[int, list[dict]]:
+    """
+    PRs set by the given log rows: {log_id: [{type, label, value, previous}]}.
+    Only records that beat an earlier one; a first entry is not a PR.
+    """
+    if not log_ids:
+        return {}
+    cur.execute("""
+        SELECT workout_log_id, record_type, value, previous_value AS previous
+        FROM workout.exercise_pr
+        WHERE workout_log_id = ANY(%(ids)s) AND previous_value IS NOT NULL
+        UNION ALL
+        SELECT workout_log_id, 'reps', reps, previous_reps
+        FROM workout.exercise_reps_pr
+        WHERE workout_log_id = ANY(%(ids)s) AND previous_reps IS NOT NULL
+    """, {"ids": log_ids})
+    records: dict[int, list[dict]] = {}
+    for row in cur.fetchall():
+        records.setdefault(row["workout_log_id"], []).append({
+            "type": row["record_type"],
+            "label": RECORD_LABELS[row["record_type"]],
+            "value": float(row["value"]),
+            "previous": float(row["previous"]),
+        })
+    return records
@@ -17,8 +17,11 @@ else {
 
 # Add Platform packages to PYTHONPATH
 $platformPath = Resolve-Path "..\..\02_Platform\03_ErrorHandling\packages"
-$env:PYTHONPATH = "$platformPath;$env:PYTHONPATH"
-Write-Host "PYTHONPATH set to include: $platformPath"
+$observabilityPath = Resolve-Path "..\..\02_Platform\04_Observability\packages"
+$admissionPath = Resolve-Path "..\..\02_Platform\05_Admission\packages"
+$schedulerPath = Resolve-Path "..\..\02_Platform\06_Scheduler\packages"
+$env:PYTHONPATH = "$platformPath;$observabilityPath;$admissionPath;$schedulerPath;$env:PYTHONPATH"
+Write-Host "PYTHONPATH set to include: $platformPath, $observabilityPath, $admissionPath, $schedulerPath"
 
 # Run App
 Write-Host "Starting WorkoutTracker on http://localhost:8000"
@@ -0,0 +1,47 @@
+"""
+Test setup: the app and the platform packages on sys.path (as PYTHONPATH
+does in the Dockerfile).
+
+Tests that need Postgres run against WORKOUT_TEST_PG_URI (a scratch
+database with platform_schema.sql and workout_schema.sql applied) and are
+skipped without it.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+PLATFORM = APP_ROOT.parents[1] / "02_Platform"
+sys.path[:0] = [str(APP_ROOT)] + [
+    str(PLATFORM / package / "packages")
+    for package in ("03_ErrorHandling", "04_Observability", "05_Admission", "06_Scheduler")
+]
+
+
+@pytest.fixture
+def pg_uri():
+    uri = os.environ.get("WORKOUT_TEST_PG_URI")
+    if not uri:
+        pytest.skip("WORKOUT_TEST_PG_URI not set")
+    return uri
+
+
+@pytest.fixture
+def client(pg_uri, monkeypatch):
+    """TestClient whose handlers and jobs connect to the test database."""
+    import psycopg
+    from fastapi.testclient import TestClient
+    from psycopg.rows import dict_row
+
+    import app.jobs
+    import app.main
+    import app.records
+
+    def get_connection():
+        return psycopg.connect(pg_uri, row_factory=dict_row, autocommit=True)
+
+    for module in (app.main, app.jobs, app.records):
+        monkeypatch.setattr(module, "get_connection", get_connection)
+    return TestClient(app.main.app)
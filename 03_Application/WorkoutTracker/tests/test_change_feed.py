@@ -0,0 +1,76 @@
+import uuid
+
+import psycopg
+from psycopg.rows import dict_row
+
+from app.paging import encode_change_token
+
+LIMIT = 5
+
+
+def _sql(uri, query, params=None):
+    with psycopg.connect(uri, autocommit=True, row_factory=dict_row) as conn:
+        cur = conn.execute(query, params)
+        return cur.fetchall() if cur.description else None
+
+
+def _sync(client, since=None):
+    """Follow next_token while has_more; returns (upserted ids, final response)."""
+    ids = set()
+    params = {"limit": LIMIT}
+    if since:
+        params["since"] = since
+    for _ in range(10_000):
+        response = client.get("/api/workouts/changes", params=params)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        ids.update(row["workout_log_id"] for row in body["upserts"])
+        if not body["has_more"]:
+            return ids, body
+        params["since"] = body["next_token"]
+    raise AssertionError("change feed did not finish")
+
+
+def test_initial_load_completes_after_prune(client, pg_uri):
+    workout_id = uuid.uuid4()
+    # More than one page of rows sharing one (old) xid, like a backfill
+    rows = _sql(pg_uri, """
+        INSERT INTO workout.workout_log (workout_id, workout_date, split, exercise, weight_kg, set1_reps)
+        SELECT %s, current_date, 'test', 'Feed Test ' || n, 10, 5
+        FROM generate_series(1, %s) AS n
+        RETURNING workout_log_id
+    """, (workout_id, 2 * LIMIT + 1))
+    old_ids = {row["workout_log_id"] for row in rows}
+    try:
+        # A newer delete whose tombstone is then pruned: the horizon ends up
+        # above the xid of every row inserted above
+        deleted = _sql(pg_uri, """
+            INSERT INTO workout.workout_log (workout_id, workout_date, split, exercise, set1_reps)
+            VALUES (%s, current_date, 'test', 'Feed Test deleted', 5)
+            RETURNING workout_log_id
+        """, (workout_id,))[0]["workout_log_id"]
+        _sql(pg_uri, "DELETE FROM workout.workout_log WHERE workout_log_id = %s", (deleted,))
+        _sql(pg_uri, """
+            UPDATE workout.workout_log_tombstone SET deleted_at = now() - interval '400 days'
+            WHERE workout_log_id = %s
+        """, (deleted,))
+        assert _sql(pg_uri, "SELECT workout.prune_tombstones(interval '365 days') AS n")[0]["n"] >= 1
+
+        ids, body = _sync(client)
+        assert old_ids <= ids
+
+        # The completed sync continues normally ...
+        _sync(client, body["next_token"])
+        # ... while a sync that started below the horizon must reload
+        stale = client.get("/api/workouts/changes", params={"since": encode_change_token(1, -1)})
+        assert stale.status_code == 410
+    finally:
+        removed = _sql(pg_uri, "DELETE FROM workout.workout_log WHERE workout_id = %s RETURNING exercise",
+                       (workout_id,))
+        _sql(pg_uri, "SELECT workout.pr_recompute(%s)", ([row["exercise"] for row in removed],))
+
+
+def test_invalid_tokens_are_rejected(client):
+    for token in (encode_change_token(2**63, 1), "not-a-token", encode_change_token(1, -2)):
+        response = client.get("/api/workouts/changes", params={"since": token})
+        assert response.status_code == 400
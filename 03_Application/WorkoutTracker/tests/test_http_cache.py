@@ -0,0 +1,65 @@
+from fastapi import FastAPI
+from fastapi.templating import Jinja2Templates
+from fastapi.testclient import TestClient
+
+from app.http_cache import IMMUTABLE, install_http_pipeline
+
+
+def _client(tmp_path):
+    static = tmp_path / "static"
+    static.mkdir()
+    (static / "app.css").write_text("body { color: #222; }\n" * 100)
+    (static / "logo.png").write_bytes(b"\x89PNG" + b"\0" * 100)
+
+    app = FastAPI()
+
+    @app.get("/api/items")
+    async def items():
+        return {"items": list(range(5))}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    static_files = install_http_pipeline(app, str(static), Jinja2Templates(directory=str(tmp_path)))
+    return TestClient(app, raise_server_exceptions=False), static_files
+
+
+def _vary(response):
+    return {v.strip().lower() for v in response.headers.get("vary", "").split(",") if v.strip()}
+
+
+def test_compressed_static_and_api_vary(tmp_path):
+    client, static = _client(tmp_path)
+    css = client.get(static.url("app.css"), headers={"Accept-Encoding": "gzip"})
+    assert css.headers["content-encoding"] == "gzip"
+    assert css.headers["cache-control"] == IMMUTABLE
+    assert "accept-encoding" in _vary(css)
+
+    api = client.get("/api/items")
+    assert api.headers["cache-control"] == "no-cache"
+    assert "accept-encoding" in _vary(api)
+
+
+def test_conditional_get_keeps_vary(tmp_path):
+    client, static = _client(tmp_path)
+    url = static.url("app.css")
+    etag = client.get(url).headers["etag"]
+
+    revalidated = client.get(url, headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+    assert revalidated.status_code == 304
+    assert "accept-encoding" in _vary(revalidated)
+    assert revalidated.headers["cache-control"] == IMMUTABLE
+
+    png = static.url("logo.png")
+    png_etag = client.get(png).headers["etag"]
+    not_modified = client.get(png, headers={"If-None-Match": png_etag})
+    assert not_modified.status_code == 304
+    assert "accept-encoding" not in _vary(not_modified)
+
+
+def test_server_error_is_not_stored(tmp_path):
+    client, _ = _client(tmp_path)
+    response = client.get("/boom")
+    assert response.status_code == 500
+    assert response.headers["cache-control"] == "no-store"